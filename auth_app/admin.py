@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile
+from .models import RevokedToken, UserProfile
 
 
 @admin.register(UserProfile)
@@ -7,3 +7,10 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'created_at', 'updated_at')
     readonly_fields = ('created_at', 'updated_at')
     search_fields = ('user__username', 'user__email')
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('jti', 'expires_at', 'created_at')
+    readonly_fields = ('jti', 'expires_at', 'created_at')
+    search_fields = ('jti',)
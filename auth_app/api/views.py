@@ -1,9 +1,18 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 from django.contrib.auth.models import User
+from ..revocation import revocation_store
+from ..throttling import (
+    LoginIPThrottle,
+    LoginUsernameThrottle,
+    RegisterIPThrottle,
+    RegisterUsernameThrottle,
+)
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
 
 
@@ -20,6 +29,7 @@ def get_tokens_for_user(user):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle, RegisterUsernameThrottle])
 def register(request):
     """
     Register a new user
@@ -47,6 +57,7 @@ def register(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginUsernameThrottle])
 def login(request):
     """
     Login a user and set auth cookies
@@ -105,7 +116,19 @@ def logout(request):
     Logout a user and delete all tokens
     
     POST /api/logout/
+    The refresh token is revoked, so a copy of it can no longer be used.
     """
+    refresh = request.COOKIES.get('refresh_token')
+    if refresh:
+        try:
+            refresh_token_obj = RefreshToken(refresh)
+            revocation_store.revoke(
+                refresh_token_obj['jti'],
+                datetime_from_epoch(refresh_token_obj['exp'])
+            )
+        except TokenError:
+            pass  # invalid or expired, nothing to revoke
+    
     response = Response(
         {
             'detail': 'Log-Out successfully! All Tokens will be deleted. Refresh token is now invalid.'
@@ -137,6 +160,11 @@ def refresh_token(request):
     
     try:
         refresh_token_obj = RefreshToken(refresh)
+        if revocation_store.is_revoked(refresh_token_obj['jti']):
+            return Response(
+                {'detail': 'Refresh token is invalid or expired.'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
         access_token = str(refresh_token_obj.access_token)
         
         response = Response(
@@ -1,7 +1,10 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth.models import User
 
+from .user_cache import user_cache
+
 
 class CookieJWTAuthentication(JWTAuthentication):
     """
@@ -31,3 +34,36 @@ class CookieJWTAuthentication(JWTAuthentication):
             return self.get_user(validated_token), validated_token
         except AuthenticationFailed:
             raise AuthenticationFailed('Access token is invalid or expired.')
+    
+    def get_user(self, validated_token):
+        """
+        Return the token's user, from the in-process user cache if possible.
+
+        Only active users are cached, so a miss still runs the checks of
+        JWTAuthentication.get_user (user exists, is active).
+        """
+        key = (
+            validated_token.get(api_settings.USER_ID_CLAIM),
+            validated_token.get(api_settings.JTI_CLAIM),
+        )
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        return user
+
+
+class CookieJWTStatelessAuthentication(CookieJWTAuthentication):
+    """
+    Cookie JWT authentication without any user lookup.
+
+    request.user is a TokenUser built from the token claims, so it only
+    offers the id (plus is_authenticated). For views that only compare
+    owner ids; a deactivated user keeps access until the access token
+    expires.
+    """
+    
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise AuthenticationFailed('Access token is invalid or expired.')
+        return api_settings.TOKEN_USER_CLASS(validated_token)
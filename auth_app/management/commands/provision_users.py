@@ -0,0 +1,246 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from auth_app.models import UserProfile
+
+REQUIRED_FIELDS = ('username', 'email', 'password')
+OPTIONAL_FIELDS = ('first_name', 'last_name')
+
+
+def _setup_worker():
+    # Spawned workers (macOS, Windows) start without a configured Django
+    import django
+    django.setup()
+
+
+def _hash_password(password):
+    return make_password(password)
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Create users (with profiles) in bulk from a CSV or JSONL file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='CSV file with a header row or JSONL file with one object per line '
+                 '(username, email, password; optional first_name, last_name).'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='Input format; derived from the file extension by default.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Users per bulk insert.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes used for password hashing.'
+        )
+        parser.add_argument(
+            '--skip-existing',
+            action='store_true',
+            help='Skip rows whose username or email is taken instead of aborting.'
+        )
+        parser.add_argument(
+            '--skip-password-validation',
+            action='store_true',
+            help='Do not run AUTH_PASSWORD_VALIDATORS (e.g. for generated initial passwords).'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file and report conflicts without creating users.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = self._read_rows(Path(options['path']), options['format'])
+        if not rows:
+            raise CommandError('No users found in the input file.')
+
+        rows, errors = self._validate_rows(rows, options['skip_password_validation'])
+        rows, conflicts = self._remove_conflicts(rows)
+
+        for line, message in errors:
+            self.stderr.write(f'Line {line}: {message}')
+        for line, message in conflicts:
+            write = self.stdout.write if options['skip_existing'] else self.stderr.write
+            write(f'Line {line}: {message}')
+
+        if errors or (conflicts and not options['skip_existing']):
+            raise CommandError(
+                f'{len(errors)} invalid row(s), {len(conflicts)} conflict(s); no users were created.'
+            )
+        if options['dry_run']:
+            self.stdout.write(f'{len(rows)} user(s) would be created, {len(conflicts)} skipped.')
+            return
+        if not rows:
+            self.stdout.write('Nothing to create.')
+            return
+
+        created = self._create_users(rows, max(1, options['batch_size']), max(1, options['workers']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} user(s), skipped {len(conflicts)} in {time.perf_counter() - started:.1f}s.'
+        ))
+
+    def _read_rows(self, path, file_format):
+        """
+        Return a list of (line number, row dict) from the input file.
+        """
+        if not path.exists():
+            raise CommandError(f'File not found: {path}')
+        file_format = file_format or ('jsonl' if path.suffix.lower() in ('.jsonl', '.ndjson') else 'csv')
+
+        rows = []
+        with path.open(encoding='utf-8-sig', newline='') as handle:
+            if file_format == 'csv':
+                reader = csv.DictReader(handle)
+                missing = [field for field in REQUIRED_FIELDS if field not in (reader.fieldnames or [])]
+                if missing:
+                    raise CommandError(f'CSV header is missing: {", ".join(missing)}')
+                for row in reader:
+                    rows.append((reader.line_num, row))
+            else:
+                for line, text in enumerate(handle, start=1):
+                    if not text.strip():
+                        continue
+                    try:
+                        row = json.loads(text)
+                    except json.JSONDecodeError as e:
+                        raise CommandError(f'Line {line}: invalid JSON ({e})')
+                    if not isinstance(row, dict):
+                        raise CommandError(f'Line {line}: expected a JSON object')
+                    rows.append((line, row))
+        return rows
+
+    def _validate_rows(self, rows, skip_password_validation):
+        """
+        Strip surrounding whitespace from every field (as the register and
+        login serializers do) and validate username, email and password.
+        Returns (valid rows, [(line, message)]).
+        """
+        username_validator = User.username_validator
+        valid = []
+        errors = []
+        for line, row in rows:
+            # Passwords too: the register and login serializers trim them
+            data = {field: str(row.get(field) or '').strip() for field in REQUIRED_FIELDS + OPTIONAL_FIELDS}
+
+            missing = [field for field in REQUIRED_FIELDS if not data[field]]
+            if missing:
+                errors.append((line, f'missing {", ".join(missing)}'))
+                continue
+            try:
+                username_validator(data['username'])
+                validate_email(data['email'])
+                if not skip_password_validation:
+                    validate_password(
+                        data['password'],
+                        User(username=data['username'], email=data['email'],
+                             first_name=data['first_name'], last_name=data['last_name'])
+                    )
+            except ValidationError as e:
+                errors.append((line, '; '.join(e.messages)))
+                continue
+            valid.append((line, data))
+        return valid, errors
+
+    def _remove_conflicts(self, rows):
+        """
+        Drop rows whose username or email already exists, in the database or
+        earlier in the file. The database is checked with a single query.
+        """
+        usernames = {data['username'] for _, data in rows}
+        emails = {data['email'] for _, data in rows}
+        taken_usernames = set()
+        taken_emails = set()
+        for username, email in User.objects.filter(
+            Q(username__in=usernames) | Q(email__in=emails)
+        ).values_list('username', 'email'):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+        remaining = []
+        conflicts = []
+        for line, data in rows:
+            if data['username'] in taken_usernames:
+                conflicts.append((line, f'username "{data["username"]}" already exists'))
+            elif data['email'] in taken_emails:
+                conflicts.append((line, f'email "{data["email"]}" already exists'))
+            else:
+                taken_usernames.add(data['username'])
+                taken_emails.add(data['email'])
+                remaining.append((line, data))
+        return remaining, conflicts
+
+    def _create_users(self, rows, batch_size, workers):
+        """
+        Hash the passwords in a process pool and insert users and profiles
+        batch by batch while the remaining passwords are still being hashed.
+        All batches share one transaction.
+        """
+        now = timezone.now()
+        created = 0
+        chunksize = max(1, min(batch_size, len(rows) // (workers * 4) or 1))
+
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker)
+        try:
+            hashed = executor.map(_hash_password, [data['password'] for _, data in rows], chunksize=chunksize)
+            with transaction.atomic():
+                for batch in _batches(zip(rows, hashed), batch_size):
+                    users = User.objects.bulk_create([
+                        User(
+                            username=data['username'],
+                            email=data['email'],
+                            first_name=data['first_name'],
+                            last_name=data['last_name'],
+                            password=password,
+                            date_joined=now,
+                        )
+                        for (_, data), password in batch
+                    ])
+                    if any(user.pk is None for user in users):
+                        # Backends without RETURNING (MySQL): look the ids up
+                        ids = dict(User.objects.filter(
+                            username__in=[user.username for user in users]
+                        ).values_list('username', 'id'))
+                        for user in users:
+                            user.pk = ids[user.username]
+                    UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+
+                    created += len(users)
+                    self.stdout.write(f'Created {created}/{len(rows)} users...')
+        finally:
+            # Do not wait for the remaining hashes if the import failed
+            executor.shutdown(cancel_futures=True)
+        return created
@@ -16,3 +16,19 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return f'{self.user.username} - Profile'
+
+
+class RevokedToken(models.Model):
+    """
+    Revoked refresh token (by jti), kept until the token would have expired
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,125 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings. `in` never misses an added item
+    but may report items that were never added (at roughly error_rate).
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationStore:
+    """
+    Revoked refresh tokens: the RevokedToken table with a process-wide bloom
+    filter in front of it.
+
+    is_revoked() only queries the table when the filter reports a possible
+    match, so checking a token that was not revoked costs no query. The
+    filter picks up revocations from other processes every
+    REFRESH_REVOCATION_SYNC_SECONDS (one query for the rows created since
+    the last sync) and is rebuilt every REFRESH_REVOCATION_REBUILD_SECONDS,
+    which also deletes rows of tokens that have expired anyway.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._synced_at = None
+        self._next_sync = 0.0
+        self._next_rebuild = 0.0
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token until its expiry. Revoking a token twice is a no-op.
+        """
+        try:
+            RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+        except IntegrityError:
+            pass  # revoked concurrently
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        if jti not in self._current_bloom():
+            return False
+        return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+    def reset(self):
+        """
+        Drop the filter; the next check rebuilds it from the table.
+        """
+        with self._lock:
+            self._bloom = None
+            self._next_rebuild = 0.0
+
+    def _current_bloom(self):
+        now = time.monotonic()
+        bloom = self._bloom
+        if bloom is not None and now < self._next_sync:
+            return bloom
+        with self._lock:
+            if self._bloom is None or now >= self._next_rebuild:
+                self._rebuild(now)
+            elif now >= self._next_sync:
+                self._sync(now)
+            return self._bloom
+
+    def _rebuild(self, now):
+        started_at = timezone.now()
+        RevokedToken.objects.filter(expires_at__lte=started_at).delete()
+        jtis = list(RevokedToken.objects.values_list('jti', flat=True))
+
+        # Room for twice the current revocations keeps the error rate stable
+        bloom = BloomFilter(
+            max(settings.REFRESH_REVOCATION_BLOOM_CAPACITY, len(jtis) * 2),
+            settings.REFRESH_REVOCATION_BLOOM_ERROR_RATE
+        )
+        for jti in jtis:
+            bloom.add(jti)
+
+        self._bloom = bloom
+        self._synced_at = started_at
+        self._next_sync = now + settings.REFRESH_REVOCATION_SYNC_SECONDS
+        self._next_rebuild = now + settings.REFRESH_REVOCATION_REBUILD_SECONDS
+
+    def _sync(self, now):
+        started_at = timezone.now()
+        # The overlap covers rows whose transaction committed after the last sync
+        since = self._synced_at - timedelta(seconds=settings.REFRESH_REVOCATION_SYNC_OVERLAP_SECONDS)
+        for jti in RevokedToken.objects.filter(created_at__gte=since).values_list('jti', flat=True):
+            self._bloom.add(jti)
+
+        self._synced_at = started_at
+        self._next_sync = now + settings.REFRESH_REVOCATION_SYNC_SECONDS
+
+
+revocation_store = RevocationStore()
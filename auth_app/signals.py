@@ -0,0 +1,16 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .user_cache import user_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Drop cached authentication users when a user is saved (e.g. deactivated
+    or given a new password) or deleted. QuerySet.update() sends no signal;
+    such changes take effect once the cache entries expire.
+    """
+    user_cache.invalidate(instance.pk)
@@ -0,0 +1,263 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from core.testing import QueryBudgetTestMixin
+from .models import RevokedToken, UserProfile
+from .revocation import revocation_store
+from .throttling import buckets
+from .user_cache import user_cache
+
+
+@override_settings(AUTH_THROTTLE_BUCKETS={
+    'login_ip': (3, 1),
+    'login_username': (100, 1),
+    'register_ip': (3, 1),
+    'register_username': (100, 1),
+})
+class LoginThrottleTest(APITestCase):
+    def setUp(self):
+        buckets.clear()
+        self.addCleanup(buckets.clear)
+
+    def login(self, username, **extra):
+        return self.client.post('/api/login/', {'username': username, 'password': 'wrong'}, format='json', **extra)
+
+    def test_ip_bucket_rejects_before_hashing(self):
+        statuses = [self.login(f'user{idx}').status_code for idx in range(4)]
+        self.assertEqual(statuses, [401, 401, 401, 429])
+
+    def test_forwarded_for_header_does_not_change_the_ip(self):
+        statuses = [
+            self.login(f'user{idx}', HTTP_X_FORWARDED_FOR=f'203.0.113.{idx}').status_code
+            for idx in range(4)
+        ]
+        self.assertEqual(statuses[-1], 429)
+
+    @override_settings(AUTH_THROTTLE_BUCKETS={
+        'login_ip': (100, 1),
+        'login_username': (2, 1),
+    })
+    def test_username_bucket_is_case_insensitive(self):
+        User.objects.create_user('victim', 'victim@example.com', 'Secret-Passw0rd!')
+        statuses = [self.login(name).status_code for name in ('victim', ' Victim ', 'VICTIM')]
+        self.assertEqual(statuses, [401, 401, 429])
+
+
+@override_settings(AUTH_THROTTLE_ENABLED=False)
+class AuthQueryBudgetTest(QueryBudgetTestMixin, APITransactionTestCase):
+    """
+    The auth endpoints stay within their QUERY_BUDGETS. Transaction test
+    case, so atomic blocks run as in production instead of as savepoints.
+    """
+    password = 'Budget-Passw0rd!'
+
+    def setUp(self):
+        user_cache.clear()
+        revocation_store.reset()
+        self.addCleanup(user_cache.clear)
+        self.addCleanup(revocation_store.reset)
+        # Build the revocation filter up front; its periodic rebuild is not per request
+        revocation_store.is_revoked('warm-up')
+        self.user = User.objects.create_user('budget', 'budget@example.com', self.password)
+
+    def login(self):
+        return self.client.post('/api/login/', {'username': 'budget', 'password': self.password}, format='json')
+
+    def test_register(self):
+        with self.assertQueryBudget('auth:register', 'POST'):
+            response = self.client.post('/api/register/', {
+                'username': 'newcomer',
+                'email': 'newcomer@example.com',
+                'password': self.password,
+                'confirmed_password': self.password,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_login(self):
+        with self.assertQueryBudget('auth:login', 'POST'):
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+
+    def test_refresh(self):
+        self.login()
+
+        with self.assertQueryBudget('auth:refresh_token', 'POST'):
+            response = self.client.post('/api/token/refresh/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_logout(self):
+        self.login()
+        user_cache.clear()
+
+        with self.assertQueryBudget('auth:logout', 'POST'):
+            response = self.client.post('/api/logout/')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(AUTH_THROTTLE_ENABLED=False)
+class ProvisionUsersTest(APITestCase):
+    password = 'Provision-Passw0rd!'
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def write_csv(self, rows):
+        lines = ['username,email,password,first_name'] + [','.join(row) for row in rows]
+        return self.write('users.csv', '\n'.join(lines) + '\n')
+
+    def provision(self, path, *args):
+        output = StringIO()
+        call_command('provision_users', path, '--workers', '1', *args, stdout=output, stderr=output)
+        return output.getvalue()
+
+    def login(self, username, password):
+        return self.client.post('/api/login/', {'username': username, 'password': password}, format='json')
+
+    def test_csv_creates_users_with_profiles(self):
+        path = self.write_csv([
+            ('anna', 'anna@example.com', self.password, 'Anna'),
+            ('ben', 'ben@example.com', self.password, ''),
+        ])
+
+        output = self.provision(path)
+
+        self.assertIn('Created 2 user(s), skipped 0', output)
+        anna = User.objects.get(username='anna')
+        self.assertEqual(anna.first_name, 'Anna')
+        self.assertTrue(UserProfile.objects.filter(user=anna).exists())
+        self.assertEqual(UserProfile.objects.count(), 2)
+
+    def test_jsonl_creates_users(self):
+        path = self.write('users.jsonl', '\n'.join([
+            json.dumps({'username': 'carla', 'email': 'carla@example.com', 'password': self.password}),
+            '',
+            json.dumps({'username': 'dario', 'email': 'dario@example.com', 'password': self.password,
+                        'last_name': 'Rossi'}),
+        ]))
+
+        self.provision(path)
+
+        self.assertEqual(
+            list(User.objects.order_by('username').values_list('username', 'last_name')),
+            [('carla', ''), ('dario', 'Rossi')]
+        )
+
+    def test_provisioned_user_can_log_in(self):
+        path = self.write_csv([(' anna ', 'anna@example.com', f'  {self.password} ', '')])
+
+        self.provision(path)
+
+        self.assertEqual(self.login('anna', self.password).status_code, 200)
+        self.assertEqual(self.login('anna', f' {self.password}  ').status_code, 200)
+
+    def test_conflicts_abort_without_writes(self):
+        User.objects.create_user('anna', 'anna@example.com', self.password)
+        path = self.write_csv([
+            ('ben', 'ben@example.com', self.password, ''),
+            ('anna', 'other@example.com', self.password, ''),
+            ('carla', 'anna@example.com', self.password, ''),
+            ('ben', 'ben2@example.com', self.password, ''),
+        ])
+
+        with self.assertRaisesMessage(CommandError, '0 invalid row(s), 3 conflict(s); no users were created.'):
+            self.provision(path)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_skip_existing_creates_the_rest(self):
+        User.objects.create_user('anna', 'anna@example.com', self.password)
+        path = self.write_csv([
+            ('anna', 'anna2@example.com', self.password, ''),
+            ('ben', 'ben@example.com', self.password, ''),
+        ])
+
+        output = self.provision(path, '--skip-existing')
+
+        self.assertIn('Line 2: username "anna" already exists', output)
+        self.assertIn('Created 1 user(s), skipped 1', output)
+        self.assertTrue(User.objects.filter(username='ben').exists())
+
+    def test_invalid_rows_abort_without_writes(self):
+        path = self.write_csv([
+            ('anna', 'anna@example.com', self.password, ''),
+            ('ben', 'not-an-email', self.password, ''),
+            ('carla', 'carla@example.com', 'short', ''),
+        ])
+
+        with self.assertRaisesMessage(CommandError, '2 invalid row(s)'):
+            self.provision(path)
+        self.assertFalse(User.objects.exists())
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write_csv([('anna', 'anna@example.com', self.password, '')])
+
+        output = self.provision(path, '--dry-run')
+
+        self.assertIn('1 user(s) would be created, 0 skipped.', output)
+        self.assertFalse(User.objects.exists())
+
+
+@override_settings(AUTH_THROTTLE_ENABLED=False)
+class RefreshTokenRevocationTest(APITestCase):
+    password = 'Revoke-Passw0rd!'
+
+    def setUp(self):
+        revocation_store.reset()
+        self.addCleanup(revocation_store.reset)
+        User.objects.create_user('revoker', 'revoker@example.com', self.password)
+        self.client.post('/api/login/', {'username': 'revoker', 'password': self.password}, format='json')
+        self.refresh = self.client.cookies['refresh_token'].value
+
+    def refresh_with(self, token):
+        self.client.cookies['refresh_token'] = token
+        return self.client.post('/api/token/refresh/')
+
+    def test_token_that_was_never_revoked_refreshes(self):
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 200)
+
+    def test_token_is_rejected_after_logout(self):
+        self.client.post('/api/logout/')
+
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    def test_revocation_survives_a_filter_rebuild(self):
+        self.client.post('/api/logout/')
+        revocation_store.reset()
+
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    @override_settings(REFRESH_REVOCATION_SYNC_SECONDS=0)
+    def test_revocation_by_another_process_is_picked_up(self):
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 200)
+        token = RefreshToken(self.refresh)
+        RevokedToken.objects.create(jti=token['jti'], expires_at=datetime_from_epoch(token['exp']))
+
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+    def test_rebuild_purges_expired_revocations(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti='expired', expires_at=now - timedelta(minutes=1))
+        RevokedToken.objects.create(jti='current', expires_at=now + timedelta(days=1))
+        revocation_store.reset()
+
+        self.assertFalse(revocation_store.is_revoked('expired'))
+        self.assertTrue(revocation_store.is_revoked('current'))
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['current'])
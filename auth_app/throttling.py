@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketStore:
+    """
+    Process-wide token buckets keyed by (scope, ident).
+
+    A bucket holds up to `capacity` tokens and refills continuously at
+    `per_minute` tokens per minute; every attempt takes one token. At most
+    AUTH_THROTTLE_MAX_BUCKETS buckets are kept, the least recently used one
+    is dropped first (an idle bucket is full again anyway).
+    """
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_minute):
+        """
+        Take a token. Returns (allowed, seconds until the next token).
+        """
+        now = time.monotonic()
+        rate = per_minute / 60.0
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > settings.AUTH_THROTTLE_MAX_BUCKETS:
+                self._buckets.popitem(last=False)
+        wait = 0 if allowed else (1 - tokens) / rate
+        return allowed, wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+buckets = TokenBucketStore()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle backed by the in-process token buckets. The bucket size and
+    refill rate come from AUTH_THROTTLE_BUCKETS[scope].
+
+    DRF checks throttles before the view runs, so rejected login and
+    register attempts never reach password hashing.
+    """
+    scope = None
+
+    def __init__(self):
+        self._wait = None
+
+    def get_ident_for(self, request):
+        """
+        Return the value to throttle on, or None to skip this throttle.
+        """
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if not settings.AUTH_THROTTLE_ENABLED:
+            return True
+
+        ident = self.get_ident_for(request)
+        if ident is None:
+            return True
+
+        capacity, per_minute = settings.AUTH_THROTTLE_BUCKETS[self.scope]
+        allowed, self._wait = buckets.take((self.scope, ident), capacity, per_minute)
+        if not allowed:
+            print(f"⚠️ Throttled {self.scope}: {ident}")
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_ident_for(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    def get_ident_for(self, request):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username.strip():
+            return None
+        return username.strip().lower()
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(UsernameThrottle):
+    scope = 'login_username'
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = 'register_ip'
+
+
+class RegisterUsernameThrottle(UsernameThrottle):
+    scope = 'register_username'
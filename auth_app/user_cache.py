@@ -0,0 +1,62 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+
+
+class UserCache:
+    """
+    Process-wide, size-bounded LRU cache of authenticated users.
+
+    Entries are keyed by (user id, token id), so a cached user is only
+    reused for the token it was loaded for, and expire after
+    AUTH_USER_CACHE_TTL_SECONDS. Saving or deleting a user drops all of its
+    entries in this process (see signals.py); other processes pick the
+    change up once their entries expire.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return a copy of the cached user for the key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Requests get their own instance, so changes to request.user stay local
+        return copy.copy(user)
+
+    def set(self, key, user):
+        ttl = settings.AUTH_USER_CACHE_TTL_SECONDS
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.copy(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.AUTH_USER_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """
+        Drop all cached entries of a user.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
@@ -0,0 +1,104 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper() hook that counts queries and their total
+    execution time. With keep_sql=True the statements are kept as well.
+    """
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.keep_sql = keep_sql
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+            if self.keep_sql:
+                self.queries.append(sql)
+
+
+def get_query_budget(view_name, method):
+    """
+    Return the query budget for a view (URL name such as 'quiz:quiz-detail')
+    and HTTP method from QUERY_BUDGETS, or None if there is none. A budget
+    is either a number for all methods or a dict of per-method numbers.
+    """
+    budget = settings.QUERY_BUDGETS.get(view_name)
+    if isinstance(budget, dict):
+        budget = budget.get(method.upper())
+    if budget is None:
+        budget = settings.QUERY_BUDGET_DEFAULT
+    return budget
+
+
+class QueryBudgetMiddleware:
+    """
+    Records the number of SQL queries and the total SQL time of every
+    request, adds them as X-Query-Count / X-Query-Time-Ms response headers
+    and reports requests that exceed their view's budget.
+
+    Enabled with QUERY_BUDGET_ENABLED. Queries of streamed response bodies
+    are not included. Supports sync and async requests, so under ASGI the
+    async views are not forced onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        return self.process_response(request, response, recorder)
+
+    async def __acall__(self, request):
+        # Async ORM calls (and sync views below this middleware) run
+        # thread-sensitive, i.e. on the request's sync thread and its
+        # connection, so the recorder has to be installed there
+        recorder = QueryRecorder()
+        await sync_to_async(self._add_recorder)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self._remove_recorder)(recorder)
+        return self.process_response(request, response, recorder)
+
+    def _add_recorder(self, recorder):
+        connection.execute_wrappers.append(recorder)
+
+    def _remove_recorder(self, recorder):
+        connection.execute_wrappers.remove(recorder)
+
+    def process_response(self, request, response, recorder):
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-Query-Time-Ms'] = f'{recorder.duration * 1000:.1f}'
+
+        match = request.resolver_match
+        if match is not None:
+            budget = get_query_budget(match.view_name, request.method)
+            if budget is not None and recorder.count > budget:
+                print(
+                    f"⚠️ Query budget exceeded: {request.method} {request.path} ({match.view_name}) "
+                    f"ran {recorder.count} queries in {recorder.duration * 1000:.1f} ms, budget is {budget}"
+                )
+        return response
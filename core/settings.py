@@ -45,6 +45,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -76,6 +77,24 @@ DATABASES = {
     }
 }
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered quiz detail JSON, validated by ETag on every read
+    'quiz_payloads': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quiz-payloads',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -123,6 +142,9 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Number of reverse proxies in front of the app; client IPs (throttling)
+    # are only taken from X-Forwarded-For behind that many proxies
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 # JWT Configuration
@@ -134,6 +156,31 @@ SIMPLE_JWT = {
     'SIGNING_KEY': SECRET_KEY,
 }
 
+# Authenticated users are cached per process for a short time (keyed by user
+# id and token id, dropped when the user is saved or deleted); 0 disables
+AUTH_USER_CACHE_TTL_SECONDS = int(os.environ.get('AUTH_USER_CACHE_TTL_SECONDS', 60))
+AUTH_USER_CACHE_MAX_ENTRIES = 1000
+
+# Refresh tokens revoked on logout (RevokedToken table, checked through an
+# in-process bloom filter). Revocations from other processes are picked up
+# within REFRESH_REVOCATION_SYNC_SECONDS
+REFRESH_REVOCATION_SYNC_SECONDS = 5
+REFRESH_REVOCATION_SYNC_OVERLAP_SECONDS = 60
+REFRESH_REVOCATION_REBUILD_SECONDS = 60 * 60
+REFRESH_REVOCATION_BLOOM_CAPACITY = 100000
+REFRESH_REVOCATION_BLOOM_ERROR_RATE = 0.001
+
+# Token buckets for login and register, checked before any password hashing:
+# scope -> (burst size, refilled attempts per minute), kept per process
+AUTH_THROTTLE_ENABLED = os.environ.get('AUTH_THROTTLE_ENABLED', 'True') == 'True'
+AUTH_THROTTLE_BUCKETS = {
+    'login_ip': (20, 10),
+    'login_username': (5, 5),
+    'register_ip': (5, 2),
+    'register_username': (3, 1),
+}
+AUTH_THROTTLE_MAX_BUCKETS = 100000
+
 # CORS Configuration
 
 CORS_ALLOWED_ORIGINS = [
@@ -147,6 +194,11 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_EXPOSE_HEADERS = [
     'Content-Type',
     'Set-Cookie',
+    'ETag',
+    'Last-Modified',
+    'X-Query-Count',
+    'X-Query-Time-Ms',
+    'Retry-After',
 ]
 CORS_ALLOW_HEADERS = [
     'accept',
@@ -158,4 +210,125 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',
+    'if-modified-since',
+]
+
+# Whisper Configuration
+
+WHISPER_MODEL_SIZE = os.environ.get('WHISPER_MODEL_SIZE', 'base')
+WHISPER_LANGUAGE = os.environ.get('WHISPER_LANGUAGE', 'de')
+# Load the Whisper model when a quiz worker (or the inline executor) starts
+# instead of on its first job. The web tier never loads it.
+WHISPER_PRELOAD = os.environ.get('WHISPER_PRELOAD', 'False') == 'True'
+# 'pcm': keep the native audio stream and decode it to 16 kHz PCM in memory.
+# 'mp3': legacy mode, transcode to MP3 via yt-dlp before transcription.
+AUDIO_INGEST_MODE = os.environ.get('AUDIO_INGEST_MODE', 'pcm')
+# Use existing YouTube subtitles/captions in WHISPER_LANGUAGE instead of
+# downloading and transcribing the audio when available.
+USE_YOUTUBE_CAPTIONS = os.environ.get('USE_YOUTUBE_CAPTIONS', 'True') == 'True'
+MIN_CAPTION_TRANSCRIPT_LENGTH = 200
+# Audio longer than WHISPER_PARALLEL_MIN_SECONDS is split at silence into
+# ~WHISPER_CHUNK_SECONDS chunks, transcribed across a process pool.
+# Set WHISPER_PARALLEL_WORKERS to 1 to always transcribe in one call.
+WHISPER_PARALLEL_WORKERS = int(os.environ.get('WHISPER_PARALLEL_WORKERS', max(1, (os.cpu_count() or 1) // 2)))
+WHISPER_PARALLEL_MIN_SECONDS = 600
+WHISPER_CHUNK_SECONDS = 300
+WHISPER_CHUNK_SEARCH_SECONDS = 15
+
+# Quiz Generation Configuration
+
+# Question generator backend. Use 'quiz_app.pipeline.generators.StubQuestionGenerator'
+# for offline load tests and CI.
+QUIZ_GENERATOR_BACKEND = os.environ.get(
+    'QUIZ_GENERATOR_BACKEND',
+    'quiz_app.pipeline.generators.GeminiQuestionGenerator'
+)
+# Gemini calls: per-attempt timeout, overall deadline including retries,
+# retry count with jittered exponential backoff, process-wide concurrency cap
+GEMINI_TIMEOUT_SECONDS = 60
+GEMINI_DEADLINE_SECONDS = 180
+GEMINI_MAX_RETRIES = 3
+GEMINI_BACKOFF_BASE_SECONDS = 1.0
+GEMINI_BACKOFF_MAX_SECONDS = 20.0
+GEMINI_MAX_CONCURRENCY = 4
+
+# Transcripts longer than one window are split into windows that are sent
+# to Gemini concurrently; the candidate questions are merged afterwards.
+QUIZ_GENERATION_WINDOW_TOKENS = 4000
+QUIZ_GENERATION_MAX_WINDOWS = 8
+QUIZ_GENERATION_CONCURRENCY = 4
+
+# Short transcripts are generated from a streamed response; every question
+# is persisted as soon as it is complete
+QUIZ_GENERATION_STREAMING = os.environ.get('QUIZ_GENERATION_STREAMING', 'True') == 'True'
+
+# Parsed Gemini responses are cached per prompt fingerprint
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 5000
+
+# Quiz Worker Configuration
+
+QUIZ_WORKER_CONCURRENCY = int(os.environ.get('QUIZ_WORKER_CONCURRENCY', 2))
+QUIZ_WORKER_POLL_INTERVAL = 2.0
+
+# Running jobs send heartbeats; a job whose worker misses them for the lease
+# (e.g. a crashed process) is queued again, or failed after JOB_MAX_ATTEMPTS
+JOB_LEASE_SECONDS = 90
+JOB_MAX_ATTEMPTS = 2
+
+# With QUIZ_INLINE_WORKERS > 0 the web process runs new jobs itself on a
+# dedicated executor with that many threads (no run_quiz_worker needed)
+QUIZ_INLINE_WORKERS = int(os.environ.get('QUIZ_INLINE_WORKERS', 0))
+
+# Concurrent jobs for the same video attach to one in-flight pipeline run.
+# A run whose leader misses heartbeats for the lease is taken over; finished
+# results stay attachable for the linger window.
+SINGLE_FLIGHT_LEASE_SECONDS = 90
+SINGLE_FLIGHT_LINGER_SECONDS = 60
+SINGLE_FLIGHT_POLL_INTERVAL = 1.0
+
+# Job progress is written at most once per interval (seconds)
+JOB_PROGRESS_MIN_INTERVAL = 1.0
+
+# Server-Sent Events progress stream (GET /api/quizzes/jobs/<id>/events/)
+JOB_EVENTS_POLL_INTERVAL = 0.5
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+JOB_EVENTS_MAX_SECONDS = 30 * 60
+
+# Metrics Configuration
+# /api/metrics/ only answers scrapes from these addresses (REMOTE_ADDR);
+# everyone else gets 403. Job counts are read from the database at most
+# once per METRICS_JOB_COUNTS_TTL seconds.
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+METRICS_JOB_COUNTS_TTL = 15
+
+# Query Budget Configuration
+# QueryBudgetMiddleware adds X-Query-Count / X-Query-Time-Ms headers and
+# reports requests that run more queries than their view's budget. Budgets
+# are keyed by URL name, per HTTP method (counts include authentication).
+QUERY_BUDGET_ENABLED = os.environ.get('QUERY_BUDGET_ENABLED', 'False') == 'True'
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGETS = {
+    'quiz:quiz-list-create': {'GET': 4, 'POST': 2},
+    'quiz:quiz-detail': {'GET': 5, 'PATCH': 5, 'DELETE': 9},
+    'quiz:quiz-job-detail': 1,
+    'auth:register': 5,
+    'auth:login': 1,
+    'auth:logout': 4,
+    'auth:refresh_token': 2,
+}
+
+# Import Budget Configuration
+# `manage.py check_import_budget` boots the web tier (apps and all URL
+# modules) in a fresh interpreter. It must stay within these limits and must
+# not load the ML / download dependencies, which only the quiz worker needs.
+IMPORT_BUDGET_SECONDS = 2.0
+IMPORT_BUDGET_RSS_MB = 150
+IMPORT_BUDGET_FORBIDDEN_MODULES = [
+    'torch',
+    'whisper',
+    'yt_dlp',
+    'google.generativeai',
+    'numpy',
 ]
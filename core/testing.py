@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from django.db import connection
+
+from .middleware import QueryRecorder, get_query_budget
+
+
+@contextmanager
+def assert_query_budget(view_name, method='GET'):
+    """
+    Assert that the block stays within the QUERY_BUDGETS entry of a view.
+
+        with assert_query_budget('quiz:quiz-list-create', 'GET'):
+            client.get('/api/quizzes/')
+
+    Works independently of QUERY_BUDGET_ENABLED. On failure the executed
+    statements are included in the message.
+    """
+    budget = get_query_budget(view_name, method)
+    if budget is None:
+        raise AssertionError(f'No query budget configured for {view_name} {method}.')
+
+    recorder = QueryRecorder(keep_sql=True)
+    with connection.execute_wrapper(recorder):
+        yield recorder
+
+    if recorder.count > budget:
+        statements = '\n'.join(f'{idx}. {sql}' for idx, sql in enumerate(recorder.queries, start=1))
+        raise AssertionError(
+            f'{method} {view_name} ran {recorder.count} queries, budget is {budget}:\n{statements}'
+        )
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin for the QUERY_BUDGETS of the quiz and auth endpoints:
+
+        class QuizListQueryTest(QueryBudgetTestMixin, APITestCase):
+            def test_list(self):
+                with self.assertQueryBudget('quiz:quiz-list-create', 'GET'):
+                    self.client.get('/api/quizzes/')
+    """
+
+    def assertQueryBudget(self, view_name, method='GET'):
+        return assert_query_budget(view_name, method)
@@ -1,5 +1,15 @@
 from django.contrib import admin
-from .models import Quiz, Question, Answer
+from .models import (
+    Quiz,
+    Question,
+    Answer,
+    QuizGenerationJob,
+    TranscriptCache,
+    PipelineFlight,
+    GenerationCache,
+    PipelineRun,
+    PipelineWorker,
+)
 
 
 class AnswerInline(admin.TabularInline):
@@ -14,7 +24,8 @@ class QuestionInline(admin.TabularInline):
 
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
-    list_display = ('title', 'user', 'created_at')
+    list_display = ('title', 'user', 'transcript_source', 'created_at')
+    list_filter = ('transcript_source',)
     search_fields = ('title', 'user__username')
     readonly_fields = ('created_at', 'updated_at')
     inlines = [QuestionInline]
@@ -31,3 +42,48 @@ class QuestionAdmin(admin.ModelAdmin):
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ('answer_text', 'question', 'is_correct')
     search_fields = ('answer_text', 'question__question_text')
+
+
+@admin.register(QuizGenerationJob)
+class QuizGenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'stage', 'created_at', 'finished_at')
+    list_filter = ('status', 'stage')
+    search_fields = ('youtube_url', 'user__username')
+    readonly_fields = ('created_at', 'updated_at', 'started_at', 'finished_at')
+
+
+@admin.register(TranscriptCache)
+class TranscriptCacheAdmin(admin.ModelAdmin):
+    list_display = ('video_id', 'title', 'source', 'model_size', 'language', 'created_at')
+    list_filter = ('source', 'model_size', 'language')
+    search_fields = ('video_id', 'title')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(PipelineFlight)
+class PipelineFlightAdmin(admin.ModelAdmin):
+    list_display = ('key', 'status', 'heartbeat_at', 'expires_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('key',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(GenerationCache)
+class GenerationCacheAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'model_name', 'hits', 'created_at', 'last_used_at', 'expires_at')
+    search_fields = ('fingerprint',)
+    readonly_fields = ('created_at', 'last_used_at')
+
+
+@admin.register(PipelineRun)
+class PipelineRunAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job', 'status', 'failed_stage', 'total_seconds', 'created_at')
+    list_filter = ('status', 'failed_stage')
+    search_fields = ('youtube_url',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(PipelineWorker)
+class PipelineWorkerAdmin(admin.ModelAdmin):
+    list_display = ('name', 'loaded_models', 'started_at', 'heartbeat_at')
+    readonly_fields = ('started_at',)
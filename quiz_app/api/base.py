@@ -0,0 +1,97 @@
+import math
+from asgiref.sync import sync_to_async
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAuthenticated, PermissionDenied, Throttled
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of DRF's APIView for views served through ASGI.
+
+    DRF 3.14 only dispatches synchronously, so this view authenticates with
+    the configured DRF authentication classes and checks permission_classes
+    (IsAuthenticated by default) and throttle_classes in a worker thread,
+    then hands the handlers a DRF Request. Handlers are `async def` methods
+    that use the async ORM and return DRF Responses (or plain Django
+    responses), so a waiting request never occupies a thread.
+
+    APIExceptions raised by the checks or the handlers (e.g. ParseError
+    for a malformed body) become error responses with their status code.
+    Object permissions are not checked; handlers compare owners themselves.
+    """
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    parser_classes = (JSONParser, FormParser, MultiPartParser)
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Cookie/JWT authenticated like the DRF views, which are CSRF exempt too
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = None
+        if request.method.lower() in self.http_method_names:
+            handler = getattr(self, request.method.lower(), None)
+        if handler is None:
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+
+        request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in self.authentication_classes]
+        )
+        try:
+            await sync_to_async(self.initial)(request)
+            response = await handler(request, *args, **kwargs)
+        except APIException as e:
+            response = self.handle_exception(e)
+        return self.finalize_response(request, response)
+
+    def initial(self, request):
+        """
+        Authenticate the request and run the permission and throttle checks
+        (like APIView.initial). Raises an APIException if one fails.
+        """
+        request.user
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise NotAuthenticated()
+                raise PermissionDenied(
+                    detail=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+
+        waits = []
+        for throttle in [throttle() for throttle in self.throttle_classes]:
+            if not throttle.allow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            waits = [wait for wait in waits if wait is not None]
+            raise Throttled(max(waits, default=None))
+
+    def handle_exception(self, exc):
+        response = Response({"detail": exc.detail}, status=exc.status_code)
+        if getattr(exc, 'wait', None):
+            response['Retry-After'] = str(math.ceil(exc.wait))
+        return response
+
+    def finalize_response(self, request, response):
+        """
+        Render DRF Responses as JSON; other responses pass through.
+        """
+        if isinstance(response, Response):
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = JSONRenderer.media_type
+            response.renderer_context = {'request': request, 'response': response, 'view': self}
+            response.render()
+        return response
@@ -0,0 +1,90 @@
+import hashlib
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+from ..models import Quiz
+
+PAYLOAD_CACHE_ALIAS = 'quiz_payloads'
+
+
+async def aget_quiz_version(quiz_id):
+    """
+    Return the owner and version information of a quiz in a single query,
+    or None if the quiz does not exist.
+
+    The version covers the quiz row and its child rows (latest question
+    timestamp plus question and answer counts), so any change to the quiz
+    content yields a new ETag. Question and answer changes, including
+    deletes, also bump Quiz.updated_at (see signals and add_questions), so
+    Last-Modified moves with them.
+    """
+    version = await Quiz.objects.filter(id=quiz_id).annotate(
+        questions_updated_at=Max('questions__updated_at'),
+        question_count=Count('questions', distinct=True),
+        answer_count=Count('questions__answers'),
+    ).values(
+        'id', 'user_id', 'updated_at', 'questions_updated_at', 'question_count', 'answer_count'
+    ).afirst()
+    if version is None:
+        return None
+
+    last_modified = version['updated_at']
+    if version['questions_updated_at'] and version['questions_updated_at'] > last_modified:
+        last_modified = version['questions_updated_at']
+
+    fingerprint = ':'.join(str(part) for part in (
+        version['id'],
+        version['updated_at'].isoformat(),
+        version['questions_updated_at'].isoformat() if version['questions_updated_at'] else '',
+        version['question_count'],
+        version['answer_count'],
+    ))
+    version['etag'] = quote_etag(hashlib.sha1(fingerprint.encode('utf-8')).hexdigest())
+    version['last_modified'] = last_modified
+    return version
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current version.
+    If-None-Match takes precedence when both are sent (RFC 9110).
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _payload_key(quiz_id):
+    return f'quiz-payload:{quiz_id}'
+
+
+def get_cached_payload(quiz_id, etag):
+    """
+    Return the rendered JSON for the quiz if it was cached for this ETag.
+    """
+    cached = caches[PAYLOAD_CACHE_ALIAS].get(_payload_key(quiz_id))
+    if cached is None or cached[0] != etag:
+        return None
+    return cached[1]
+
+
+def set_cached_payload(quiz_id, etag, content):
+    caches[PAYLOAD_CACHE_ALIAS].set(_payload_key(quiz_id), (etag, content))
+
+
+def invalidate_quiz_payload(quiz_id):
+    caches[PAYLOAD_CACHE_ALIAS].delete(_payload_key(quiz_id))
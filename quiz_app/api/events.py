@@ -0,0 +1,54 @@
+import asyncio
+import json
+import time
+from django.conf import settings
+
+from ..models import QuizGenerationJob
+from .serializers import QuizGenerationJobSerializer
+
+FINISHED_STATUSES = (QuizGenerationJob.STATUS_SUCCEEDED, QuizGenerationJob.STATUS_FAILED)
+
+
+def format_event(event, data):
+    """
+    Encode one Server-Sent Event.
+    """
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+async def job_event_stream(job_id):
+    """
+    Yield Server-Sent Events for a generation job until it has finished.
+
+    The job row is polled with the async ORM. A `progress` event is sent
+    whenever status, stage, progress or quiz change, followed by a final
+    `done` event. Comment lines keep idle connections open through proxies.
+    """
+    started = time.monotonic()
+    last_sent = started
+    last_state = None
+
+    while True:
+        job = await QuizGenerationJob.objects.filter(id=job_id).afirst()
+        if job is None:
+            yield format_event('error', {"error": "Job not found."})
+            return
+
+        now = time.monotonic()
+        finished = job.status in FINISHED_STATUSES
+        state = (job.status, job.stage, job.progress, job.quiz_id)
+        if state != last_state:
+            data = QuizGenerationJobSerializer(job).data
+            yield format_event('done' if finished else 'progress', data)
+            last_state = state
+            last_sent = now
+        elif now - last_sent >= settings.JOB_EVENTS_KEEPALIVE_SECONDS:
+            yield ': keepalive\n\n'
+            last_sent = now
+
+        if finished:
+            return
+        if now - started >= settings.JOB_EVENTS_MAX_SECONDS:
+            yield format_event('timeout', {"error": "Event stream closed, reconnect to continue."})
+            return
+        await asyncio.sleep(settings.JOB_EVENTS_POLL_INTERVAL)
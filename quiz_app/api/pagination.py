@@ -0,0 +1,105 @@
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class QuizKeysetPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    The cursor encodes the position of the last item of the previous page,
+    so each page is a single indexed range query no matter how deep the
+    client pages (no OFFSET scans).
+    """
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset[:page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of paginate_queryset() for async views.
+        """
+        queryset, page_size = self.get_page_queryset(queryset, request)
+        return self.set_page([obj async for obj in queryset[:page_size + 1]], page_size)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the ordered queryset starting after the cursor position and
+        the page size.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by('-created_at', '-id')
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+        return queryset, page_size
+
+    def set_page(self, results, page_size):
+        """
+        Trim the fetched rows (one more than page_size) to the page and
+        remember where the next page starts.
+        """
+        self.has_next = len(results) > page_size
+        results = results[:page_size]
+        self.next_position = None
+        if self.has_next:
+            last = results[-1]
+            self.next_position = (last.created_at, last.id)
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            created_at_str, pk_str = decoded.rsplit('|', 1)
+            created_at = parse_datetime(created_at_str)
+            pk = int(pk_str)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def encode_cursor(self, position):
+        created_at, pk = position
+        raw = f'{created_at.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
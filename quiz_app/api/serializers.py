@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..models import Quiz, Question, Answer
+from ..models import Quiz, Question, Answer, QuizGenerationJob
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -21,13 +21,15 @@ class QuestionDetailSerializer(serializers.ModelSerializer):
         fields = ('id', 'question_title', 'question_options', 'answer', 'created_at', 'updated_at')
     
     def get_question_options(self, obj):
-        """Returns all answer options"""
-        return [answer.answer_text for answer in obj.answers.all().order_by('order')]
+        """Returns all answer options (uses prefetched answers, see Quiz.objects.with_questions())"""
+        return [answer.answer_text for answer in obj.answers.all()]
     
     def get_answer(self, obj):
-        """Returns the correct answer"""
-        correct_answer = obj.answers.filter(is_correct=True).first()
-        return correct_answer.answer_text if correct_answer else None
+        """Returns the correct answer (selected in memory from the prefetched answers)"""
+        for answer in obj.answers.all():
+            if answer.is_correct:
+                return answer.answer_text
+        return None
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -48,11 +50,73 @@ class QuizSerializer(serializers.ModelSerializer):
         read_only_fields = ('user', 'created_at', 'updated_at', 'video_url')
 
 
+class QuizListSerializer(serializers.ModelSerializer):
+    """
+    Quiz serializer for the listing endpoint.
+
+    Returns quiz headers with the annotated question count by default.
+    Nested questions are only included with include_questions=True, and
+    `fields` restricts the output to a subset of fields (sparse fieldsets).
+    """
+    questions = QuestionDetailSerializer(many=True, read_only=True)
+    video_url = serializers.CharField(source='youtube_url', read_only=True)
+    question_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Quiz
+        fields = ('id', 'title', 'description', 'video_url', 'created_at', 'updated_at', 'question_count', 'questions')
+    
+    # Model columns needed to render each field
+    FIELD_COLUMNS = {
+        'id': ('id',),
+        'title': ('title',),
+        'description': ('description',),
+        'video_url': ('youtube_url',),
+        'created_at': ('created_at',),
+        'updated_at': ('updated_at',),
+        'question_count': (),
+        'questions': (),
+    }
+    
+    def __init__(self, *args, fields=None, include_questions=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        allowed = set(fields) if fields else set(self.fields)
+        if not include_questions:
+            allowed.discard('questions')
+        for field_name in set(self.fields) - allowed:
+            self.fields.pop(field_name)
+    
+    @classmethod
+    def columns_for(cls, field_names):
+        """
+        Return the model columns required to render the given fields.
+        """
+        columns = {'id', 'created_at'}
+        for field_name in field_names:
+            columns.update(cls.FIELD_COLUMNS.get(field_name, ()))
+        return sorted(columns)
+
+
 class QuizCreateSerializer(serializers.Serializer):
     url = serializers.URLField()
+    regenerate = serializers.BooleanField(required=False, default=False)
 
 
 class QuizUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Quiz
         fields = ('title', 'description')
+
+
+class QuizGenerationJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.IntegerField(source='id', read_only=True)
+    video_url = serializers.CharField(source='youtube_url', read_only=True)
+    quiz_id = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = QuizGenerationJob
+        fields = (
+            'job_id', 'video_url', 'status', 'stage', 'progress', 'error', 'quiz_id',
+            'created_at', 'updated_at', 'started_at', 'finished_at',
+        )
+        read_only_fields = fields
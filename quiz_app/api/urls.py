@@ -5,5 +5,9 @@ app_name = 'quiz'
 
 urlpatterns = [
     path('quizzes/', views.QuizListCreateView.as_view(), name='quiz-list-create'),
+    path('quizzes/jobs/<int:job_id>/', views.QuizGenerationJobDetailView.as_view(), name='quiz-job-detail'),
+    path('quizzes/jobs/<int:job_id>/events/', views.QuizGenerationJobEventsView.as_view(), name='quiz-job-events'),
     path('quizzes/<int:quiz_id>/', views.QuizDetailView.as_view(), name='quiz-detail'),
+    path('pipeline/status/', views.pipeline_status, name='pipeline-status'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
@@ -1,56 +1,118 @@
-import os
-import json
-import tempfile
-from pathlib import Path
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
-import yt_dlp
-import whisper
-from dotenv import load_dotenv
 
-load_dotenv()
+from auth_app.authentication import CookieJWTStatelessAuthentication
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+from ..metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, jobs as jobs_gauge, registry
+from ..models import PipelineWorker, Quiz, QuizGenerationJob
+from ..pipeline.runner import submit_inline_job
+from ..pipeline.whisper_registry import whisper_models
+from .base import AsyncAPIView
+from .caching import (
+    aget_quiz_version,
+    is_not_modified,
+    set_validators,
+    get_cached_payload,
+    set_cached_payload,
+    invalidate_quiz_payload,
+)
+from .events import job_event_stream
+from .pagination import QuizKeysetPagination
+from .serializers import (
+    QuizSerializer,
+    QuizListSerializer,
+    QuizCreateSerializer,
+    QuizUpdateSerializer,
+    QuizGenerationJobSerializer,
+)
 
-from ..models import Quiz, Question, Answer
-from .serializers import QuizSerializer, QuizCreateSerializer, QuizUpdateSerializer
 
-
-class QuizListCreateView(APIView):
+class QuizListCreateView(AsyncAPIView):
     """
     API endpoint to manage quizzes.
     
     GET /api/quizzes/ - Get all quizzes for the authenticated user
     POST /api/quizzes/ - Create a new quiz from a YouTube video URL
     """
-    permission_classes = [IsAuthenticated]
     
-    def get(self, request):
+    async def get(self, request):
         """
-        Get all quizzes for the authenticated user.
+        Get the quizzes of the authenticated user, newest first.
+        
+        Query parameters:
+        - cursor: opaque cursor from the previous page's "next" link
+        - page_size: number of quizzes per page (default PAGE_SIZE, max 100)
+        - include=questions: include the questions with their answers
+        - fields=id,title,...: only return the given fields (400 for unknown ones)
         """
         try:
-            quizzes = Quiz.objects.filter(user=request.user).prefetch_related('questions__answers')
-            serializer = QuizSerializer(quizzes, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            include_questions = 'questions' in self._list_param(request, 'include')
+            fields = self._list_param(request, 'fields') or list(QuizListSerializer.Meta.fields)
+            unknown = [name for name in fields if name not in QuizListSerializer.Meta.fields]
+            if unknown:
+                return Response(
+                    {"error": f"Unknown fields: {', '.join(unknown)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if include_questions and 'questions' not in fields:
+                fields.append('questions')
+            
+            quizzes = Quiz.objects.filter(user_id=request.user.id).only(
+                *QuizListSerializer.columns_for(fields)
+            )
+            if 'question_count' in fields:
+                quizzes = quizzes.annotate(question_count=Count('questions'))
+            if include_questions:
+                quizzes = quizzes.with_questions()
+            
+            paginator = QuizKeysetPagination()
+            page = await paginator.apaginate_queryset(quizzes, request, view=self)
+            serializer = QuizListSerializer(
+                page,
+                many=True,
+                fields=fields,
+                include_questions=include_questions
+            )
+            return paginator.get_paginated_response(serializer.data)
+        except NotFound as e:
+            return Response(
+                {"error": str(e.detail)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except APIException:
+            raise
         except Exception as e:
             return Response(
                 {"error": f"An error occurred: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def post(self, request):
+    def _list_param(self, request, name):
+        value = request.query_params.get(name, '')
+        return [item.strip() for item in value.split(',') if item.strip()]
+    
+    async def post(self, request):
         """
-        Create a new quiz from a YouTube video URL.
+        Queue the creation of a new quiz from a YouTube video URL.
+        
+        Request: {"url": "https://www.youtube.com/watch?v=example", "regenerate": false}
+        "regenerate": true skips cached Gemini responses.
+        Returns: 202 Accepted with the generation job (poll /api/quizzes/jobs/{job_id}/)
         
-        Request: {"url": "https://www.youtube.com/watch?v=example"}
-        Returns: Quiz object with all questions and answers
+        With QUIZ_INLINE_WORKERS the job is started right away on this
+        process's pipeline executor instead of waiting for run_quiz_worker.
         """
         try:
             serializer = QuizCreateSerializer(data=request.data)
@@ -60,271 +122,218 @@ class QuizListCreateView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            youtube_url = serializer.validated_data['url']
-            
-            video_info = self._extract_video_info(youtube_url)
-            
-            quiz = Quiz.objects.create(
-                user=request.user,
-                title=video_info['title'],
-                description=video_info.get('description', '')[:500],
-                youtube_url=youtube_url,
-                transcript=video_info.get('transcript', '')
+            job = await QuizGenerationJob.objects.acreate(
+                user_id=request.user.id,
+                youtube_url=serializer.validated_data['url'],
+                force_regenerate=serializer.validated_data['regenerate']
             )
+            if settings.QUIZ_INLINE_WORKERS > 0:
+                submit_inline_job(job.id)
             
-            questions_data = self._generate_questions(video_info)
-            
-            # Create Question and Answer objects
-            for idx, q_data in enumerate(questions_data):
-                question = Question.objects.create(
-                    quiz=quiz,
-                    question_text=q_data['question'],
-                    question_type='multiple_choice',
-                    order=idx
-                )
-                
-                # Create answer options
-                for ans_idx, answer_text in enumerate(q_data['options']):
-                    is_correct = (answer_text == q_data['correct_answer'])
-                    Answer.objects.create(
-                        question=question,
-                        answer_text=answer_text,
-                        is_correct=is_correct,
-                        order=ans_idx
-                    )
-            
-            serializer = QuizSerializer(quiz)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            serializer = QuizGenerationJobSerializer(job)
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
             
+        except APIException:
+            raise
         except Exception as e:
-            import traceback
-            error_trace = traceback.format_exc()
-            print(f"❌ Error creating quiz: {error_trace}")
             return Response(
-                {"error": f"Failed to create quiz: {str(e)}", "details": error_trace},
+                {"error": f"Failed to queue quiz creation: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def pipeline_status(request):
+    """
+    Report whether the configured Whisper model is loaded where jobs run:
+    in the live quiz workers (by their PipelineWorker heartbeat rows), or
+    in this process if it runs jobs itself (QUIZ_INLINE_WORKERS).
+    "warm" means every live worker has the model loaded.
     
-    def _extract_video_info(self, youtube_url):
-        """
-        Extract video information from YouTube URL using yt-dlp.
-        Downloads audio and returns video metadata with transcript.
-        Raises exception on failure.
-        """
-        temp_dir = None
-        try:
-            temp_dir = tempfile.mkdtemp()
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-                'outtmpl': os.path.join(temp_dir, '%(title)s.%(ext)s'),
+    GET /api/pipeline/status/
+    """
+    model_size = settings.WHISPER_MODEL_SIZE
+    if settings.QUIZ_INLINE_WORKERS > 0:
+        workers = [{'name': 'inline', 'loaded_models': whisper_models.loaded_sizes()}]
+    else:
+        cutoff = timezone.now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        workers = list(
+            PipelineWorker.objects.filter(heartbeat_at__gte=cutoff).values('name', 'loaded_models')
+        )
+    return Response(
+        {
+            "whisper": {
+                "model_size": model_size,
+                "warm": bool(workers) and all(model_size in worker['loaded_models'] for worker in workers),
+                "loaded_models": sorted({size for worker in workers for size in worker['loaded_models']}),
+                "workers": len(workers),
             }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print(f"Downloading audio from {youtube_url}...")
-                info = ydl.extract_info(youtube_url, download=True)
-                
-                audio_file = None
-                for file in os.listdir(temp_dir):
-                    if file.endswith('.mp3'):
-                        audio_file = os.path.join(temp_dir, file)
-                        break
-                
-                if not audio_file:
-                    raise RuntimeError("Failed to download or convert audio file from YouTube.")
-                
-                print(f"Transcribing audio: {audio_file}...")
-                transcript = self._transcribe_audio(audio_file)
-                
-                return {
-                    'title': info.get('title', 'Untitled Video'),
-                    'description': info.get('description', '')[:500],
-                    'duration': info.get('duration', 0),
-                    'uploader': info.get('uploader', 'Unknown'),
-                    'transcript': transcript,
-                }
-        finally:
-            if temp_dir and os.path.exists(temp_dir):
-                import shutil
-                try:
-                    shutil.rmtree(temp_dir)
-                except:
-                    pass
-    
-    def _transcribe_audio(self, audio_file):
-        """
-        Transcribe audio file using Whisper AI.
-        Raises exception on failure.
-        """
-        print("Loading Whisper model...")
-        model = whisper.load_model("base")
-        print("Transcribing audio...")
-        result = model.transcribe(audio_file, language="de")
-        transcript = result.get('text', '')
-        
-        if not transcript:
-            raise ValueError("Whisper transcription returned empty result.")
-        
-        print(f"✅ Transcription completed: {len(transcript)} characters")
-        return transcript
-    
-    def _generate_questions(self, video_info):
-        """
-        Generate quiz questions using Google Gemini AI (gemini-2.5-flash).
-        Raises exception if AI is unavailable or fails - no fallback.
-        """
-        if genai is None:
-            raise RuntimeError("Google Gemini module (google-generativeai) not installed or not available.")
-        
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise RuntimeError("GEMINI_API_KEY environment variable not set.")
-        
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        transcript = video_info.get('transcript', '')
-        if not transcript:
-            raise ValueError("No transcript available from video.")
-        
-        prompt = f"""
-Basierend auf folgendem Transkript eines Videos, erstelle 10 Multiple-Choice Quizfragen.
+        },
+        status=status.HTTP_200_OK
+    )
 
-Video Titel: {video_info.get('title', 'Untitled')}
-Video Beschreibung: {video_info.get('description', '')}
 
-Transkript:
-{transcript[:3000]}
+@require_GET
+def metrics(request):
+    """
+    Prometheus text-format metrics of this process, plus job counts by
+    status from the database (cached for METRICS_JOB_COUNTS_TTL seconds).
+    Only scrapers from METRICS_ALLOWED_IPS are served.
+    
+    GET /api/metrics/
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
 
-Bitte erstelle 10 Quizfragen im JSON-Format mit folgendem Schema:
-[
-  {{
-    "question": "Die Frage?",
-    "options": ["Option A", "Option B", "Option C", "Option D"],
-    "correct_answer": "Option A"
-  }}
-]
+    counts = cache.get_or_set(
+        'metrics:job_counts',
+        lambda: dict(
+            QuizGenerationJob.objects.order_by().values_list('status').annotate(total=Count('id'))
+        ),
+        settings.METRICS_JOB_COUNTS_TTL
+    )
+    for job_status, _ in QuizGenerationJob.STATUS_CHOICES:
+        jobs_gauge.set(counts.get(job_status, 0), status=job_status)
+    return HttpResponse(registry.render(), content_type=METRICS_CONTENT_TYPE)
 
-Wichtig:
-- Alle Fragen müssen auf dem Transkript basieren
-- Genau 4 Optionen pro Frage
-- Die Optionen sollten plausibel sein
-- Nur JSON zurückgeben, nichts anderes
-"""
-        
-        print("Generating questions with Gemini (gemini-2.5-flash)...")
-        try:
-            response = model.generate_content(prompt)
-        except Exception as e:
-            print(f"❌ Gemini API error during content generation: {str(e)}")
-            raise RuntimeError(f"Gemini API failed to generate content: {str(e)}")
-        
+
+class QuizGenerationJobDetailView(APIView):
+    """
+    GET /api/quizzes/jobs/{job_id}/ - Get the status and stage of a quiz generation job
+    """
+    # Polled frequently and only compares owner ids: no user lookup
+    authentication_classes = [CookieJWTStatelessAuthentication]
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, job_id):
+        """
+        Get a specific generation job for the authenticated user.
+        """
         try:
-            if not response or not hasattr(response, 'text'):
-                print(f"❌ Gemini returned response without text property. Response object: {type(response)}")
-                if hasattr(response, 'candidates') and response.candidates:
-                    print(f"Response has {len(response.candidates)} candidates")
-                    if hasattr(response.candidates[0], 'content'):
-                        print(f"First candidate content: {response.candidates[0].content}")
-                raise ValueError("Gemini API returned response without text content.")
+            try:
+                job = QuizGenerationJob.objects.get(id=job_id)
+            except QuizGenerationJob.DoesNotExist:
+                return Response(
+                    {"error": "Job not found."},
+                    status=status.HTTP_404_NOT_FOUND
+                )
             
-            response_text = response.text.strip()
+            if job.user_id != request.user.id:
+                return Response(
+                    {"error": "Access denied. This job belongs to another user."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
             
-            if not response_text:
-                print(f"❌ Gemini returned empty text")
-                raise ValueError("Gemini API returned empty response text.")
+            serializer = QuizGenerationJobSerializer(job)
+            return Response(serializer.data, status=status.HTTP_200_OK)
             
-        except AttributeError as e:
-            print(f"❌ Error accessing response.text: {str(e)}")
-            print(f"Response object type: {type(response)}")
-            print(f"Response object attributes: {dir(response)}")
-            raise RuntimeError(f"Gemini response format error: {str(e)}")
-        
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
-        
-        try:
-            questions = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing error: {str(e)}. Response preview: {response_text[:500]}")
-            raise ValueError(f"Gemini returned invalid JSON: {str(e)}")
-        
-        if not questions or len(questions) == 0:
-            print("❌ Gemini returned empty questions list")
-            raise ValueError("Gemini returned empty questions list.")
-        
-        print(f"✅ Generated {len(questions)} questions with Gemini")
-        return questions
+        except Exception as e:
+            return Response(
+                {"error": f"An error occurred: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def create_quiz(request):
+class QuizGenerationJobEventsView(AsyncAPIView):
     """
-    Legacy endpoint wrapper for creating quiz.
-    Can be used as an alternative to the class-based view.
+    GET /api/quizzes/jobs/{job_id}/events/ - Stream the progress of a generation job
+
+    Server-Sent Events stream with the job's stage transitions and progress
+    (same payload as the job detail endpoint). Served through ASGI, an open
+    stream does not occupy a worker thread.
     """
-    view = QuizListCreateView.as_view()
-    return view(request)
+    authentication_classes = [CookieJWTStatelessAuthentication]
+    
+    async def get(self, request, job_id):
+        """
+        Server-Sent Events stream with the job's stage transitions and
+        progress (same payload as the job detail endpoint).
+        """
+        job = await QuizGenerationJob.objects.filter(id=job_id).only('id', 'user_id').afirst()
+        if job is None:
+            return Response(
+                {"error": "Job not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if job.user_id != request.user.id:
+            return Response(
+                {"error": "Access denied. This job belongs to another user."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        response = StreamingHttpResponse(job_event_stream(job_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
 
-class QuizDetailView(APIView):
+class QuizDetailView(AsyncAPIView):
     """    
     GET /api/quizzes/{id}/ - Get a specific quiz with all questions
     PATCH /api/quizzes/{id}/ - Update specific fields of a quiz
     DELETE /api/quizzes/{id}/ - Delete a quiz permanently
     """
-    permission_classes = [IsAuthenticated]
     
-    def get(self, request, quiz_id):
+    async def get(self, request, quiz_id):
         """
         Get a specific quiz for the authenticated user.
+        
+        Supports conditional requests (If-None-Match / If-Modified-Since)
+        and serves the rendered JSON from the payload cache when the quiz
+        is unchanged.
         """
         try:
-            try:
-                quiz = Quiz.objects.prefetch_related('questions__answers').get(id=quiz_id)
-            except Quiz.DoesNotExist:
+            version = await aget_quiz_version(quiz_id)
+            if version is None:
                 return Response(
                     {"error": "Quiz not found."},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            if quiz.user != request.user:
+            if version['user_id'] != request.user.id:
                 return Response(
                     {"error": "Access denied. This quiz belongs to another user."},
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            serializer = QuizSerializer(quiz)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            etag = version['etag']
+            last_modified = version['last_modified']
+            if is_not_modified(request, etag, last_modified):
+                return set_validators(HttpResponseNotModified(), etag, last_modified)
+            
+            content = get_cached_payload(quiz_id, etag)
+            if content is None:
+                quiz = await Quiz.objects.with_questions().aget(id=quiz_id)
+                serializer = QuizSerializer(quiz)
+                content = JSONRenderer().render(serializer.data)
+                set_cached_payload(quiz_id, etag, content)
+            
+            response = HttpResponse(content, content_type='application/json', status=status.HTTP_200_OK)
+            return set_validators(response, etag, last_modified)
             
+        except APIException:
+            raise
         except Exception as e:
             return Response(
                 {"error": f"An error occurred: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def patch(self, request, quiz_id):
+    async def patch(self, request, quiz_id):
         """
         Partially update a quiz (title, description only).
         """
         try:
             try:
-                quiz = Quiz.objects.prefetch_related('questions__answers').get(id=quiz_id)
+                quiz = await Quiz.objects.with_questions().aget(id=quiz_id)
             except Quiz.DoesNotExist:
                 return Response(
                     {"error": "Quiz not found."},
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            if quiz.user != request.user:
+            if quiz.user_id != request.user.id:
                 return Response(
                     {"error": "Access denied. This quiz belongs to another user."},
                     status=status.HTTP_403_FORBIDDEN
@@ -337,37 +346,45 @@ class QuizDetailView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            serializer.save()
+            for field, value in serializer.validated_data.items():
+                setattr(quiz, field, value)
+            await quiz.asave(update_fields=[*serializer.validated_data, 'updated_at'])
+            invalidate_quiz_payload(quiz.id)
             
             response_serializer = QuizSerializer(quiz)
             return Response(response_serializer.data, status=status.HTTP_200_OK)
             
+        except APIException:
+            raise
         except Exception as e:
             return Response(
                 {"error": f"An error occurred: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def delete(self, request, quiz_id):
+    async def delete(self, request, quiz_id):
         """
         Delete a quiz and all associated questions permanently.
         """
         try:
             try:
-                quiz = Quiz.objects.get(id=quiz_id)
+                quiz = await Quiz.objects.only('id', 'user_id').aget(id=quiz_id)
             except Quiz.DoesNotExist:
                 return Response(
                     {"error": "Quiz not found."},
                     status=status.HTTP_404_NOT_FOUND
                 )
-            if quiz.user != request.user:
+            if quiz.user_id != request.user.id:
                 return Response(
                     {"error": "Access denied. This quiz belongs to another user."},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            quiz.delete()
+            await quiz.adelete()
+            invalidate_quiz_payload(quiz_id)
             return Response(status=status.HTTP_204_NO_CONTENT)
             
+        except APIException:
+            raise
         except Exception as e:
             return Response(
                 {"error": f"An error occurred: {str(e)}"},
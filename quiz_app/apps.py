@@ -5,3 +5,6 @@ class QuizAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz_app'
     verbose_name = 'Quiz Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
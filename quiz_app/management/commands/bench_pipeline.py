@@ -0,0 +1,325 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from quiz_app.pipeline.runner import QuizPipeline
+from quiz_app.pipeline.timing import StageTimer
+from quiz_app.pipeline.whisper_registry import whisper_models
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_USERNAME = 'bench-pipeline'
+RSS_SAMPLE_INTERVAL = 0.05
+
+
+def _current_rss_mb():
+    """
+    Resident set size of this process in MB (Linux), falling back to the
+    peak RSS where /proc is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        if resource is None:
+            return 0.0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class BenchTimer(StageTimer):
+    """
+    StageTimer that also records DB queries and peak RSS per stage.
+
+    Queries are counted on the calling thread's connection only, so queries
+    of generation window threads are not included. Wall and CPU time of a
+    nested stage (persist inside generate) are excluded from the enclosing
+    stage, queries and peak RSS are not.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+        self._active = []
+
+    @contextmanager
+    def stage(self, name, observe=True):
+        entry = self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0})
+        entry.setdefault('queries', 0)
+        entry.setdefault('peak_rss_mb', 0.0)
+        queries_start = self.queries
+        self._active.append(entry)
+        try:
+            with super().stage(name, observe=observe):
+                yield
+        finally:
+            self.sample_rss()
+            self._active.remove(entry)
+            entry['queries'] += self.queries - queries_start
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def sample_rss(self):
+        rss = _current_rss_mb()
+        for entry in list(self._active):
+            entry['peak_rss_mb'] = max(entry['peak_rss_mb'], round(rss, 1))
+
+
+@contextmanager
+def _throwaway_database(temp_dir):
+    """
+    Point the default connection at a freshly migrated database and drop it
+    afterwards, so the bench user, quizzes and cache rows are not kept.
+    Generation window threads use their own connections, which a
+    rolled-back transaction would not cover.
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    if connection.vendor == 'sqlite':
+        # An in-memory database fails concurrent writes instead of waiting
+        test_settings['NAME'] = os.path.join(temp_dir, 'bench.sqlite3')
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+
+
+@contextmanager
+def _sample_rss(timer):
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(RSS_SAMPLE_INTERVAL):
+            timer.sample_rss()
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        sampler.join()
+
+
+class BenchPipeline(QuizPipeline):
+    """
+    Pipeline that reads local audio files (file:// URLs) through yt-dlp.
+    """
+    ydl_options = {'enable_file_urls': True}
+
+
+def _trim_audio(source, seconds, target_dir):
+    """
+    Cut the first `seconds` of a fixture without re-encoding.
+    """
+    target = os.path.join(target_dir, f'{Path(source).stem}-{seconds}s{Path(source).suffix}')
+    cmd = [
+        'ffmpeg', '-nostdin', '-y', '-v', 'error',
+        '-i', source, '-t', str(seconds), '-vn', '-c', 'copy', target,
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise CommandError('ffmpeg not found. Please install FFmpeg and add it to PATH.')
+    except subprocess.CalledProcessError as e:
+        raise CommandError(f"Failed to trim {source}: {e.stderr.decode(errors='ignore')[-500:]}")
+    return target
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, check=True, text=True,
+            cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the quiz pipeline offline against local audio fixtures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures',
+            nargs='+',
+            help='Local audio files (any format ffmpeg can read).'
+        )
+        parser.add_argument(
+            '--durations',
+            default='60,300,900',
+            help='Comma-separated audio lengths in seconds; each fixture is cut to every length.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='Runs per fixture and length.'
+        )
+        parser.add_argument(
+            '--generator',
+            default='quiz_app.pipeline.generators.StubQuestionGenerator',
+            help='Question generator backend (default: offline stub).'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON results of an earlier run to compare against.'
+        )
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            help='Fail if a stage got slower than the compared run by more than this percentage.'
+        )
+
+    def handle(self, *args, **options):
+        for fixture in options['fixtures']:
+            if not os.path.isfile(fixture):
+                raise CommandError(f'Fixture not found: {fixture}')
+        try:
+            durations = [int(value) for value in options['durations'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--durations must be a comma-separated list of seconds.')
+
+        self.stdout.write(f'Loading Whisper model "{settings.WHISPER_MODEL_SIZE}"...')
+        whisper_models.preload([settings.WHISPER_MODEL_SIZE])
+
+        results = {
+            'created_at': timezone.now().isoformat(),
+            'commit': _git_commit(),
+            'settings': {
+                'generator': options['generator'],
+                'whisper_model_size': settings.WHISPER_MODEL_SIZE,
+                'audio_ingest_mode': settings.AUDIO_INGEST_MODE,
+                'whisper_parallel_workers': settings.WHISPER_PARALLEL_WORKERS,
+                'generation_streaming': settings.QUIZ_GENERATION_STREAMING,
+            },
+            'runs': [],
+        }
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self.stdout.write('Creating a throwaway database...')
+            with _throwaway_database(temp_dir), override_settings(QUIZ_GENERATOR_BACKEND=options['generator']):
+                user = User.objects.create(username=BENCH_USERNAME)
+                for fixture in options['fixtures']:
+                    for seconds in durations:
+                        audio_file = _trim_audio(fixture, seconds, temp_dir)
+                        for repeat in range(max(1, options['repeat'])):
+                            run = self._run(user, fixture, seconds, audio_file)
+                            run['repeat'] = repeat
+                            results['runs'].append(run)
+                            self._print_run(run)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
+
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = self._compare(baseline, results, options['max_regression'])
+            if regressions:
+                raise CommandError(f'{regressions} stage(s) regressed by more than {options["max_regression"]}%.')
+
+    def _run(self, user, fixture, seconds, audio_file):
+        """
+        Run extraction, transcription, generation and persistence for one
+        audio file and return the measurements.
+        """
+        pipeline = BenchPipeline(force_regenerate=True)
+        timer = pipeline.timer = BenchTimer()
+        url = Path(audio_file).resolve().as_uri()
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer.count_query), _sample_rss(timer):
+            video_info = pipeline._extract_video_info(url)
+            pipeline._generate_questions(user, url, video_info)
+        total = time.perf_counter() - started
+
+        max_child_rss_mb = None
+        if resource is not None:
+            max_child_rss_mb = round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1)
+        return {
+            'fixture': os.path.basename(fixture),
+            'seconds': seconds,
+            'transcript_chars': len(video_info['transcript']),
+            'total_wall_s': round(total, 3),
+            'max_child_rss_mb': max_child_rss_mb,
+            'stages': {
+                name: {key: round(value, 3) if isinstance(value, float) else value
+                       for key, value in entry.items()}
+                for name, entry in timer.stages.items()
+            },
+        }
+
+    def _print_run(self, run):
+        self.stdout.write(f'\n{run["fixture"]} @ {run["seconds"]}s (total {run["total_wall_s"]:.2f}s)')
+        for name, entry in run['stages'].items():
+            self.stdout.write(
+                f'  {name:<10} {entry["wall_s"]:>8.2f}s wall {entry["cpu_s"]:>8.2f}s cpu '
+                f'{entry.get("peak_rss_mb", 0):>8.1f} MB rss {entry.get("queries", 0):>5} queries'
+            )
+
+    def _compare(self, baseline, results, max_regression):
+        """
+        Print per-stage wall time changes against a baseline. Returns the
+        number of stages exceeding max_regression (0 if not set).
+        """
+        def by_key(data):
+            runs = {}
+            for run in data.get('runs', []):
+                runs.setdefault((run['fixture'], run['seconds']), []).append(run)
+            return runs
+
+        def mean_wall(runs, stage):
+            values = [run['stages'][stage]['wall_s'] for run in runs if stage in run['stages']]
+            return sum(values) / len(values) if values else None
+
+        self.stdout.write(f'\nCompared with {baseline.get("commit") or "baseline"}:')
+        regressions = 0
+        old_runs = by_key(baseline)
+        for key, new in by_key(results).items():
+            old = old_runs.get(key)
+            if not old:
+                continue
+            self.stdout.write(f'{key[0]} @ {key[1]}s')
+            for stage in new[0]['stages']:
+                before = mean_wall(old, stage)
+                after = mean_wall(new, stage)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before * 100
+                marker = ''
+                if max_regression is not None and change > max_regression:
+                    regressions += 1
+                    marker = '  ⚠️'
+                self.stdout.write(f'  {stage:<10} {before:>8.2f}s -> {after:>8.2f}s ({change:+.1f}%){marker}')
+        return regressions
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: boots Django, loads every URL module (and so
+# every view) like a web worker does, and reports what that cost.
+PROBE = '''
+import json, os, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+seconds = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+except ImportError:
+    rss_mb = None
+print(json.dumps({'seconds': seconds, 'rss_mb': rss_mb, 'modules': sorted(sys.modules)}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Check that booting the web tier stays within the import time and RSS budget.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Number of fresh interpreters to measure; the fastest run counts.'
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'))
+        results = []
+        for _ in range(max(1, options['runs'])):
+            probe = subprocess.run(
+                [sys.executable, '-c', PROBE],
+                capture_output=True, text=True, env=env, cwd=settings.BASE_DIR
+            )
+            if probe.returncode != 0:
+                raise CommandError(f'Import probe failed:\n{probe.stderr[-2000:]}')
+            results.append(json.loads(probe.stdout.strip().splitlines()[-1]))
+
+        best = min(results, key=lambda result: result['seconds'])
+        loaded = set(best['modules'])
+        forbidden = sorted(
+            name for name in settings.IMPORT_BUDGET_FORBIDDEN_MODULES
+            if name in loaded
+        )
+
+        rss = f'{best["rss_mb"]:.0f} MB' if best['rss_mb'] is not None else 'n/a'
+        self.stdout.write(f'Web tier boot: {best["seconds"]:.2f}s, peak RSS {rss}, {len(loaded)} modules')
+
+        problems = []
+        if best['seconds'] > settings.IMPORT_BUDGET_SECONDS:
+            problems.append(f'import time {best["seconds"]:.2f}s exceeds {settings.IMPORT_BUDGET_SECONDS}s')
+        if best['rss_mb'] is not None and best['rss_mb'] > settings.IMPORT_BUDGET_RSS_MB:
+            problems.append(f'peak RSS {best["rss_mb"]:.0f} MB exceeds {settings.IMPORT_BUDGET_RSS_MB} MB')
+        if forbidden:
+            problems.append(f'pipeline-only modules loaded: {", ".join(forbidden)}')
+
+        if problems:
+            raise CommandError('Import budget exceeded: ' + '; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Import budget OK.'))
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quiz_app.metrics import start_metrics_server
+from quiz_app.pipeline.runner import (
+    claim_jobs, preload_whisper, remove_worker, report_worker, run_job_in_thread, worker_name
+)
+
+
+class Command(BaseCommand):
+    help = 'Run queued quiz generation jobs from a bounded worker pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.QUIZ_WORKER_CONCURRENCY,
+            help='Maximum number of jobs processed concurrently.'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.QUIZ_WORKER_POLL_INTERVAL,
+            help='Seconds to wait between polls when the queue is empty.'
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            help='Serve this worker\'s Prometheus metrics on the given port.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process all currently pending jobs and exit.'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+        once = options['once']
+
+        if options['metrics_port']:
+            start_metrics_server(options['metrics_port'])
+            self.stdout.write(f'Serving metrics on port {options["metrics_port"]}.')
+
+        if settings.WHISPER_PRELOAD:
+            self.stdout.write(f'Loading Whisper model "{settings.WHISPER_MODEL_SIZE}"...')
+            preload_whisper()
+
+        name = worker_name()
+        heartbeat_interval = settings.JOB_LEASE_SECONDS / 3
+        reported_at = 0.0
+        self.stdout.write(f'Quiz worker {name} started with {workers} worker(s).')
+        in_flight = set()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='quiz-worker') as executor:
+            try:
+                while True:
+                    if time.monotonic() - reported_at >= heartbeat_interval:
+                        # Tells /api/pipeline/status/ which models this worker has loaded
+                        report_worker(name)
+                        reported_at = time.monotonic()
+
+                    job_ids = claim_jobs(workers - len(in_flight))
+                    for job_id in job_ids:
+                        self.stdout.write(f'Running job {job_id}...')
+                        in_flight.add(executor.submit(run_job_in_thread, job_id))
+
+                    if once and not in_flight:
+                        break
+
+                    if not in_flight:
+                        time.sleep(poll_interval)
+                        continue
+
+                    done, in_flight = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        try:
+                            job = future.result()
+                        except Exception as e:
+                            self.stderr.write(f'Worker error: {str(e)}')
+                            continue
+                        self.stdout.write(f'Job {job.pk} finished with status {job.status}.')
+            except KeyboardInterrupt:
+                self.stdout.write('Shutting down, waiting for running jobs to finish...')
+
+        remove_worker(name)
+        self.stdout.write(self.style.SUCCESS('Quiz worker stopped.'))
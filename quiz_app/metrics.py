@@ -0,0 +1,196 @@
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# In-process metrics in the Prometheus text exposition format. Every process
+# (web server, each quiz worker) keeps its own values; workers can expose
+# theirs with `run_quiz_worker --metrics-port`.
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for name, value in labels:
+        escaped = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        Yield (suffix, labels, value) tuples for the exposition.
+        """
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            yield '', list(zip(self.labelnames, key)), value
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            yield '', list(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def samples(self):
+        with self._lock:
+            values = [(key, dict(state, buckets=list(state['buckets']))) for key, state in self._values.items()]
+        for key, state in sorted(values, key=lambda item: item[0]):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['buckets']):
+                cumulative += count
+                yield '_bucket', labels + [('le', _format_value(float(bound)))], cumulative
+            yield '_bucket', labels + [('le', '+Inf')], state['count']
+            yield '_sum', labels, state['sum']
+            yield '_count', labels, state['count']
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+registry = Registry()
+
+pipeline_stage_seconds = registry.register(Histogram(
+    'quiz_pipeline_stage_seconds',
+    'Wall time of pipeline stages (metadata, download, decode, transcribe, generate, persist).',
+    ['stage']
+))
+pipeline_run_seconds = registry.register(Histogram(
+    'quiz_pipeline_run_seconds',
+    'Wall time of complete pipeline runs.',
+    ['status']
+))
+pipeline_failures_total = registry.register(Counter(
+    'quiz_pipeline_failures_total',
+    'Failed pipeline runs by the stage they failed in.',
+    ['stage']
+))
+cache_requests_total = registry.register(Counter(
+    'quiz_cache_requests_total',
+    'Lookups in the transcript, caption and LLM response caches.',
+    ['cache', 'result']
+))
+gemini_request_seconds = registry.register(Histogram(
+    'quiz_gemini_request_seconds',
+    'Latency of Gemini API requests (until the response or first stream chunk is available).',
+    ['outcome']
+))
+gemini_retries_total = registry.register(Counter(
+    'quiz_gemini_retries_total',
+    'Retried Gemini API requests.'
+))
+jobs = registry.register(Gauge(
+    'quiz_jobs',
+    'Quiz generation jobs by status (set when the metrics endpoint is scraped).',
+    ['status']
+))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, addr=''):
+    """
+    Serve this process's metrics over HTTP from a daemon thread.
+    """
+    server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0003_quizgenerationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=11)),
+                ('model_size', models.CharField(max_length=20)),
+                ('language', models.CharField(max_length=10)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('duration', models.PositiveIntegerField(default=0)),
+                ('uploader', models.CharField(blank=True, max_length=255)),
+                ('transcript', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Transcript Cache Entry',
+                'verbose_name_plural': 'Transcript Cache',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='transcriptcache',
+            constraint=models.UniqueConstraint(fields=('video_id', 'model_size', 'language'), name='unique_transcript_per_video_model_language'),
+        ),
+    ]
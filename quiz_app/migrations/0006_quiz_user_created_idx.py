@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0005_pipelineflight'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='quiz_user_created_idx'),
+        ),
+    ]
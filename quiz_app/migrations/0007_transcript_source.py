@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0006_quiz_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='transcript_source',
+            field=models.CharField(choices=[('whisper', 'Whisper transcription'), ('captions_manual', 'YouTube subtitles'), ('captions_auto', 'YouTube automatic captions')], default='whisper', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='transcriptcache',
+            name='source',
+            field=models.CharField(choices=[('whisper', 'Whisper transcription'), ('captions_manual', 'YouTube subtitles'), ('captions_auto', 'YouTube automatic captions')], default='whisper', max_length=20),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0007_transcript_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='force_regenerate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='GenerationCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=100)),
+                ('questions', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Generation Cache Entry',
+                'verbose_name_plural': 'Generation Cache',
+                'indexes': [models.Index(fields=['last_used_at'], name='quiz_app_ge_last_us_35f488_idx'), models.Index(fields=['expires_at'], name='quiz_app_ge_expires_24b4cd_idx')],
+            },
+        ),
+    ]
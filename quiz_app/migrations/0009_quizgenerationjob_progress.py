@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0008_generationcache_force_regenerate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='quizgenerationjob',
+            name='stage',
+            field=models.CharField(choices=[('queued', 'Queued'), ('metadata', 'Metadata'), ('downloading', 'Downloading'), ('transcribing', 'Transcribing'), ('generating', 'Generating'), ('saving', 'Saving'), ('done', 'Done')], default='queued', max_length=20),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0009_quizgenerationjob_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('youtube_url', models.URLField()),
+                ('status', models.CharField(choices=[('succeeded', 'Succeeded'), ('failed', 'Failed')], max_length=20)),
+                ('failed_stage', models.CharField(blank=True, max_length=20)),
+                ('stage_timings', models.JSONField(default=dict)),
+                ('total_seconds', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='runs', to='quiz_app.quizgenerationjob')),
+            ],
+            options={
+                'verbose_name': 'Pipeline Run',
+                'verbose_name_plural': 'Pipeline Runs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='quiz_app_pi_created_f1af3c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:14
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_heartbeats(apps, schema_editor):
+    # Jobs already running count from their last update, so stuck ones get recovered
+    QuizGenerationJob = apps.get_model('quiz_app', 'QuizGenerationJob')
+    QuizGenerationJob.objects.filter(status='running').update(heartbeat_at=F('updated_at'), attempts=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0010_pipelinerun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_heartbeats, migrations.RunPython.noop),
+    ]
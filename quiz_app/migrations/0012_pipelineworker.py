@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0011_quizgenerationjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineWorker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('loaded_models', models.JSONField(default=list)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('heartbeat_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Pipeline Worker',
+                'verbose_name_plural': 'Pipeline Workers',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -2,6 +2,25 @@ from django.db import models
 from django.contrib.auth.models import User
 
 
+TRANSCRIPT_SOURCES = [
+    ('whisper', 'Whisper transcription'),
+    ('captions_manual', 'YouTube subtitles'),
+    ('captions_auto', 'YouTube automatic captions'),
+]
+
+
+class QuizQuerySet(models.QuerySet):
+    def with_questions(self):
+        """
+        Prefetch questions and their answers in display order, so
+        serializers can read them without extra queries.
+        """
+        return self.prefetch_related(
+            models.Prefetch('questions', queryset=Question.objects.order_by('order')),
+            models.Prefetch('questions__answers', queryset=Answer.objects.order_by('order')),
+        )
+
+
 class Quiz(models.Model):
     """
     Quiz Model - stores quiz information and metadata
@@ -11,13 +30,19 @@ class Quiz(models.Model):
     description = models.TextField(blank=True)
     youtube_url = models.URLField()
     transcript = models.TextField(blank=True)
+    transcript_source = models.CharField(max_length=20, choices=TRANSCRIPT_SOURCES, default='whisper')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = QuizQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Quiz'
         verbose_name_plural = 'Quizzes'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='quiz_user_created_idx'),
+        ]
     
     def __str__(self):
         return f'{self.title} - {self.user.username}'
@@ -65,3 +90,209 @@ class Answer(models.Model):
     
     def __str__(self):
         return self.answer_text[:50]
+
+
+class QuizGenerationJob(models.Model):
+    """
+    QuizGenerationJob Model - tracks a queued quiz generation run
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    STAGE_QUEUED = 'queued'
+    STAGE_METADATA = 'metadata'
+    STAGE_DOWNLOADING = 'downloading'
+    STAGE_TRANSCRIBING = 'transcribing'
+    STAGE_GENERATING = 'generating'
+    STAGE_SAVING = 'saving'
+    STAGE_DONE = 'done'
+    STAGE_CHOICES = [
+        (STAGE_QUEUED, 'Queued'),
+        (STAGE_METADATA, 'Metadata'),
+        (STAGE_DOWNLOADING, 'Downloading'),
+        (STAGE_TRANSCRIBING, 'Transcribing'),
+        (STAGE_GENERATING, 'Generating'),
+        (STAGE_SAVING, 'Saving'),
+        (STAGE_DONE, 'Done'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_jobs')
+    youtube_url = models.URLField()
+    force_regenerate = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default=STAGE_QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    quiz = models.ForeignKey(Quiz, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Quiz Generation Job'
+        verbose_name_plural = 'Quiz Generation Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f'Job {self.pk} - {self.status} ({self.stage})'
+
+
+class TranscriptCache(models.Model):
+    """
+    TranscriptCache Model - stores transcripts per YouTube video so the same
+    video is only downloaded and transcribed once
+    """
+    video_id = models.CharField(max_length=11)
+    model_size = models.CharField(max_length=20)
+    language = models.CharField(max_length=10)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    duration = models.PositiveIntegerField(default=0)
+    uploader = models.CharField(max_length=255, blank=True)
+    transcript = models.TextField()
+    source = models.CharField(max_length=20, choices=TRANSCRIPT_SOURCES, default='whisper')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Transcript Cache Entry'
+        verbose_name_plural = 'Transcript Cache'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['video_id', 'model_size', 'language'],
+                name='unique_transcript_per_video_model_language'
+            ),
+        ]
+    
+    def __str__(self):
+        return f'{self.video_id} ({self.model_size}, {self.language})'
+    
+    def to_video_info(self):
+        return {
+            'title': self.title,
+            'description': self.description,
+            'duration': self.duration,
+            'uploader': self.uploader,
+            'transcript': self.transcript,
+            'transcript_source': self.source,
+        }
+
+
+class PipelineFlight(models.Model):
+    """
+    PipelineFlight Model - marks a pipeline run that is in flight for a key
+    (e.g. a video), so concurrent requests for the same key share one result
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    key = models.CharField(max_length=255, unique=True)
+    token = models.UUIDField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    heartbeat_at = models.DateTimeField()
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Pipeline Flight'
+        verbose_name_plural = 'Pipeline Flights'
+    
+    def __str__(self):
+        return f'{self.key} - {self.status}'
+
+
+class GenerationCache(models.Model):
+    """
+    GenerationCache Model - stores parsed LLM question lists keyed by a
+    fingerprint of model name, prompt and generation parameters
+    """
+    fingerprint = models.CharField(max_length=64, unique=True)
+    model_name = models.CharField(max_length=100)
+    questions = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Generation Cache Entry'
+        verbose_name_plural = 'Generation Cache'
+        indexes = [
+            models.Index(fields=['last_used_at']),
+            models.Index(fields=['expires_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.model_name} - {self.fingerprint[:12]}'
+
+
+class PipelineRun(models.Model):
+    """
+    PipelineRun Model - records the outcome and per-stage timings of one
+    pipeline execution
+    """
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    job = models.ForeignKey(QuizGenerationJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='runs')
+    youtube_url = models.URLField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    failed_stage = models.CharField(max_length=20, blank=True)
+    stage_timings = models.JSONField(default=dict)
+    total_seconds = models.FloatField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Pipeline Run'
+        verbose_name_plural = 'Pipeline Runs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f'Run {self.pk} - {self.status} ({self.total_seconds:.1f}s)'
+
+
+class PipelineWorker(models.Model):
+    """
+    PipelineWorker Model - a running quiz worker process (run_quiz_worker)
+    and the Whisper models it has loaded, refreshed by its heartbeat
+    """
+    name = models.CharField(max_length=255, unique=True)
+    loaded_models = models.JSONField(default=list)
+    started_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Pipeline Worker'
+        verbose_name_plural = 'Pipeline Workers'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
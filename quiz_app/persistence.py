@@ -0,0 +1,68 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Quiz, Question, Answer
+
+
+def create_quiz_with_questions(user, title, youtube_url, questions_data, description='', transcript='',
+                               transcript_source='whisper'):
+    """
+    Create a quiz with all its questions and answers in one transaction.
+
+    questions_data is a list of {"question", "options", "correct_answer"}
+    dicts. The rows are written with one INSERT for the quiz and one bulk
+    INSERT each for questions and answers, so a failure never leaves a
+    half-built quiz behind.
+    """
+    with transaction.atomic():
+        quiz = Quiz.objects.create(
+            user=user,
+            title=title[:255],
+            description=description[:500],
+            youtube_url=youtube_url,
+            transcript=transcript,
+            transcript_source=transcript_source
+        )
+        add_questions(quiz, questions_data, touch_quiz=False)
+    return quiz
+
+
+def add_questions(quiz, questions_data, start_order=0, touch_quiz=True):
+    """
+    Append questions with their answer options to an existing quiz using
+    bulk inserts. Returns the created Question objects.
+
+    Bulk inserts send no post_save signals, so the quiz's updated_at (its
+    Last-Modified) is bumped here unless the quiz was just created.
+    """
+    with transaction.atomic(savepoint=False):
+        questions = Question.objects.bulk_create([
+            Question(
+                quiz=quiz,
+                question_text=q_data['question'],
+                question_type='multiple_choice',
+                order=start_order + idx
+            )
+            for idx, q_data in enumerate(questions_data)
+        ])
+
+        if not connection.features.can_return_rows_from_bulk_insert:
+            questions = list(
+                quiz.questions.filter(order__gte=start_order).order_by('order')
+            )
+
+        Answer.objects.bulk_create([
+            Answer(
+                question=question,
+                answer_text=answer_text,
+                is_correct=(answer_text == q_data['correct_answer']),
+                order=ans_idx
+            )
+            for question, q_data in zip(questions, questions_data)
+            for ans_idx, answer_text in enumerate(q_data['options'])
+        ])
+
+        if touch_quiz:
+            quiz.updated_at = timezone.now()
+            Quiz.objects.filter(pk=quiz.pk).update(updated_at=quiz.updated_at)
+    return questions
@@ -0,0 +1,32 @@
+import subprocess
+
+SAMPLE_RATE = 16000
+
+
+def decode_audio(path, sample_rate=SAMPLE_RATE):
+    """
+    Decode any audio file ffmpeg understands straight to mono float32 PCM at
+    Whisper's sample rate, streamed through a pipe without an intermediate
+    file. Returns a numpy array that can be passed to model.transcribe().
+    """
+    import numpy as np
+
+    cmd = [
+        'ffmpeg',
+        '-nostdin',
+        '-threads', '0',
+        '-i', path,
+        '-f', 's16le',
+        '-ac', '1',
+        '-acodec', 'pcm_s16le',
+        '-ar', str(sample_rate),
+        '-',
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg not found. Please install FFmpeg and add it to PATH.")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-500:]}")
+
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
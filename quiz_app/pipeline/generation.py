@@ -0,0 +1,401 @@
+import re
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from django.conf import settings
+from django.db import connection
+
+from . import llm_cache
+from ..metrics import cache_requests_total
+from .generators import get_generator
+
+QUESTION_COUNT = 10
+
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text):
+    """
+    Rough token estimate (~4 characters per token) used for window sizing.
+    """
+    return len(text) // 4
+
+
+def split_transcript(transcript, window_tokens, max_windows):
+    """
+    Split a transcript into consecutive windows of about window_tokens,
+    breaking at sentence ends where possible. If that would need more than
+    max_windows windows, the windows grow instead, so the whole transcript
+    is always covered with a bounded number of requests.
+    """
+    transcript = transcript.strip()
+    window_count = min(max_windows, max(1, math.ceil(estimate_tokens(transcript) / window_tokens)))
+    window_chars = math.ceil(len(transcript) / window_count)
+
+    windows = []
+    current = ''
+    for sentence in SENTENCE_END_RE.split(transcript):
+        if current and len(current) + 1 + len(sentence) > window_chars and len(windows) < window_count - 1:
+            windows.append(current)
+            current = sentence
+        else:
+            current = f'{current} {sentence}' if current else sentence
+        # Whisper output may lack punctuation, so long runs are cut at a space
+        while len(current) > window_chars and len(windows) < window_count - 1:
+            cut = current.rfind(' ', 0, window_chars)
+            if cut <= 0:
+                cut = window_chars
+            windows.append(current[:cut])
+            current = current[cut:].lstrip()
+    if current:
+        windows.append(current)
+    return windows
+
+
+def build_prompt(video_info, transcript, count=QUESTION_COUNT, part=None):
+    """
+    Build the Gemini prompt for `count` questions about a transcript excerpt.
+    `part` is an optional (index, total) tuple for excerpts of a long video.
+    """
+    part_note = ''
+    if part is not None:
+        part_note = f"\nDies ist Abschnitt {part[0]} von {part[1]} des Transkripts.\n"
+
+    return f"""
+Basierend auf folgendem Transkript eines Videos, erstelle {count} Multiple-Choice Quizfragen.
+
+Video Titel: {video_info.get('title', 'Untitled')}
+Video Beschreibung: {video_info.get('description', '')}
+{part_note}
+Transkript:
+{transcript}
+
+Bitte erstelle {count} Quizfragen im JSON-Format mit folgendem Schema:
+[
+  {{
+    "question": "Die Frage?",
+    "options": ["Option A", "Option B", "Option C", "Option D"],
+    "correct_answer": "Option A"
+  }}
+]
+
+Wichtig:
+- Alle Fragen müssen auf dem Transkript basieren
+- Genau 4 Optionen pro Frage
+- Die Optionen sollten plausibel sein
+- Nur JSON zurückgeben, nichts anderes
+"""
+
+
+def parse_questions(response_text):
+    """
+    Parse the JSON question list from a model response (optionally wrapped
+    in a ```json code fence).
+    """
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1].split("```")[0].strip()
+
+    try:
+        questions = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON parsing error: {str(e)}. Response preview: {response_text[:500]}")
+        raise ValueError(f"Gemini returned invalid JSON: {str(e)}")
+
+    if not questions or len(questions) == 0:
+        print("❌ Gemini returned empty questions list")
+        raise ValueError("Gemini returned empty questions list.")
+    return questions
+
+
+class QuestionStreamParser:
+    """
+    Incremental parser for a streamed JSON array of question objects.
+
+    feed() takes the response text as it arrives and returns the objects
+    completed by it. Text before the opening bracket (e.g. a ```json fence)
+    is skipped, and an unterminated trailing object is never returned, so a
+    truncated response still yields every complete question.
+    """
+
+    def __init__(self):
+        self.done = False
+        self._buffer = ''
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start = None
+
+    def feed(self, text):
+        self._buffer += text
+        objects = []
+        while self._pos < len(self._buffer) and not self.done:
+            char = self._buffer[self._pos]
+            if not self._started:
+                self._started = char == '['
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                if self._depth == 0 and char == '{':
+                    self._object_start = self._pos
+                self._depth += 1
+            elif char in '}]':
+                if self._depth == 0:
+                    self.done = char == ']'
+                else:
+                    self._depth -= 1
+                    if self._depth == 0 and self._object_start is not None:
+                        raw = self._buffer[self._object_start:self._pos + 1]
+                        self._object_start = None
+                        try:
+                            objects.append(json.loads(raw))
+                        except json.JSONDecodeError as e:
+                            print(f"⚠️ Skipping malformed question in stream: {str(e)}")
+            self._pos += 1
+
+        # Drop consumed text, keeping the object that is still open
+        keep = self._object_start if self._object_start is not None else self._pos
+        self._buffer = self._buffer[keep:]
+        self._pos -= keep
+        if self._object_start is not None:
+            self._object_start = 0
+        return objects
+
+
+def generate_for_prompt(prompt, use_cache=True):
+    """
+    Return the parsed question list for a prompt, served from the LLM
+    response cache when the identical request was answered before.
+    use_cache=False forces a fresh request (the result is still stored).
+    """
+    generator = get_generator()
+    key = llm_cache.fingerprint(generator.model_name, prompt, generator.generation_params())
+    if use_cache:
+        questions = llm_cache.lookup(key)
+        cache_requests_total.inc(cache='llm', result='miss' if questions is None else 'hit')
+        if questions is not None:
+            print(f"✅ Using cached {generator.model_name} response")
+            return questions
+
+    questions = parse_questions(generator.generate(prompt))
+    llm_cache.store(key, generator.model_name, questions)
+    return questions
+
+
+def is_valid_question(q_data):
+    """
+    A usable question has text, exactly 4 string options and a correct
+    answer that is one of the options.
+    """
+    if not isinstance(q_data, dict):
+        return False
+    options = q_data.get('options')
+    return (
+        isinstance(q_data.get('question'), str)
+        and q_data['question'].strip() != ''
+        and isinstance(options, list)
+        and len(options) == 4
+        and all(isinstance(option, str) for option in options)
+        and q_data.get('correct_answer') in options
+    )
+
+
+def _normalize(text):
+    return ' '.join(re.sub(r'[^\w\s]', '', text.lower()).split())
+
+
+def merge_questions(candidates_per_window, count=QUESTION_COUNT, similarity=0.85):
+    """
+    Merge candidate questions from all windows into the final selection.
+
+    Invalid and near-duplicate questions (by normalized text similarity) are
+    set aside, then questions are picked round-robin across windows so the
+    quiz covers the whole video instead of only its beginning. If that
+    leaves fewer than `count` questions, the selection is topped up with the
+    near-duplicates the same way; exact duplicates are never used.
+    """
+    accepted = []
+    seen = []
+    queues = []
+    spare_queues = []
+    for candidates in candidates_per_window:
+        queue = []
+        spare = []
+        for q_data in candidates:
+            if not is_valid_question(q_data):
+                continue
+            normalized = _normalize(q_data['question'])
+            if any(SequenceMatcher(None, normalized, other).ratio() >= similarity for other in seen):
+                spare.append((normalized, q_data))
+                continue
+            seen.append(normalized)
+            queue.append(q_data)
+        queues.append(queue)
+        spare_queues.append(spare)
+
+    _pick_round_robin(queues, accepted, count)
+    if len(accepted) < count:
+        used = set(seen)
+        top_up = []
+        for spare in spare_queues:
+            queue = []
+            for normalized, q_data in spare:
+                if normalized not in used:
+                    used.add(normalized)
+                    queue.append(q_data)
+            top_up.append(queue)
+        _pick_round_robin(top_up, accepted, count)
+    return accepted
+
+
+def _pick_round_robin(queues, accepted, count):
+    while len(accepted) < count and any(queues):
+        for queue in queues:
+            if queue and len(accepted) < count:
+                accepted.append(queue.pop(0))
+
+
+def stream_questions(prompt, on_question=None, use_cache=True, count=QUESTION_COUNT):
+    """
+    Generate questions from a streamed response.
+
+    Every valid question is passed to on_question(q_data,
+    index) as soon as its JSON object is complete. If the stream breaks off
+    or ends early, the questions received so far are kept; only a response
+    without any usable question raises. Responses that are complete or
+    already yielded `count` questions are cached like generate_for_prompt()
+    results, truncated ones are not.
+    """
+    generator = get_generator()
+    key = llm_cache.fingerprint(generator.model_name, prompt, generator.generation_params())
+
+    accepted = []
+
+    def accept(q_data):
+        if len(accepted) >= count or not is_valid_question(q_data):
+            return
+        if on_question is not None:
+            on_question(q_data, len(accepted))
+        accepted.append(q_data)
+
+    cached = None
+    if use_cache:
+        cached = llm_cache.lookup(key)
+        cache_requests_total.inc(cache='llm', result='miss' if cached is None else 'hit')
+    if cached is not None:
+        print(f"✅ Using cached {generator.model_name} response")
+        for q_data in cached:
+            accept(q_data)
+        return accepted
+
+    parser = QuestionStreamParser()
+    parsed = []
+    chunks = generator.stream(prompt)
+    try:
+        while len(accepted) < count and not parser.done:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except Exception as e:
+                if not accepted:
+                    raise
+                print(f"⚠️ Response stream broke off, keeping {len(accepted)} questions: {str(e)}")
+                break
+            for q_data in parser.feed(chunk):
+                parsed.append(q_data)
+                accept(q_data)
+    finally:
+        chunks.close()
+
+    if not accepted:
+        print("❌ Gemini returned no valid questions")
+        raise ValueError("Gemini returned no valid questions.")
+
+    # The closing bracket usually arrives after the last needed question
+    if parser.done or len(accepted) >= count:
+        llm_cache.store(key, generator.model_name, parsed)
+    return accepted
+
+
+def generate_questions(video_info, use_cache=True, on_question=None):
+    """
+    Generate quiz questions for a video with the configured generator
+    backend (Gemini by default).
+
+    Short transcripts are sent in one request. Longer ones are split into
+    token-bounded windows that are queried concurrently (map) and merged,
+    deduplicated and reduced to QUESTION_COUNT questions (reduce).
+    Responses are cached per prompt unless use_cache is False.
+
+    on_question(q_data, index) is called for every returned question. For
+    short transcripts with QUIZ_GENERATION_STREAMING enabled it is called
+    while the response is still streaming.
+    Raises exception if AI is unavailable or fails - no fallback.
+    """
+    transcript = video_info.get('transcript', '')
+    if not transcript:
+        raise ValueError("No transcript available from video.")
+
+    window_tokens = settings.QUIZ_GENERATION_WINDOW_TOKENS
+    if estimate_tokens(transcript) <= window_tokens:
+        prompt = build_prompt(video_info, transcript)
+        if settings.QUIZ_GENERATION_STREAMING:
+            questions = stream_questions(prompt, on_question=on_question, use_cache=use_cache)
+            print(f"✅ Generated {len(questions)} questions with Gemini (streamed)")
+            return questions
+        questions = generate_for_prompt(prompt, use_cache=use_cache)
+        _emit(questions, on_question)
+        print(f"✅ Generated {len(questions)} questions with Gemini")
+        return questions
+
+    windows = split_transcript(transcript, window_tokens, settings.QUIZ_GENERATION_MAX_WINDOWS)
+    per_window = max(3, math.ceil(QUESTION_COUNT * 1.5 / len(windows)))
+    prompts = [
+        build_prompt(video_info, window, count=per_window, part=(idx + 1, len(windows)))
+        for idx, window in enumerate(windows)
+    ]
+    print(f"Generating questions from {len(windows)} transcript windows...")
+
+    def generate_for_window(prompt):
+        try:
+            return generate_for_prompt(prompt, use_cache=use_cache)
+        except (RuntimeError, ValueError) as e:
+            print(f"⚠️ Window generation failed: {str(e)}")
+            return e
+        finally:
+            # Pool threads open their own connection for the cache lookups
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=settings.QUIZ_GENERATION_CONCURRENCY) as executor:
+        results = list(executor.map(generate_for_window, prompts))
+
+    candidates = [result for result in results if not isinstance(result, Exception)]
+    if not candidates:
+        raise results[0]
+
+    questions = merge_questions(candidates)
+    if not questions:
+        raise ValueError("Gemini returned no valid questions.")
+
+    _emit(questions, on_question)
+    print(f"✅ Generated {len(questions)} questions with Gemini from {len(windows)} windows")
+    return questions
+
+
+def _emit(questions, on_question):
+    if on_question is None:
+        return
+    for index, q_data in enumerate(questions):
+        on_question(q_data, index)
@@ -0,0 +1,247 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from dotenv import load_dotenv
+
+from ..metrics import gemini_request_seconds, gemini_retries_total
+
+load_dotenv()
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_generator():
+    """
+    Return the process-wide question generator configured in
+    QUIZ_GENERATOR_BACKEND.
+    """
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = import_string(settings.QUIZ_GENERATOR_BACKEND)()
+    return _generator
+
+
+@receiver(setting_changed)
+def _reset_generator(setting, **kwargs):
+    # Lets override_settings(QUIZ_GENERATOR_BACKEND=...) switch the backend
+    global _generator
+    if setting == 'QUIZ_GENERATOR_BACKEND':
+        with _generator_lock:
+            _generator = None
+
+
+class QuestionGenerator:
+    """
+    Interface for question generation backends.
+
+    generate() takes a prompt and returns the raw response text, which is
+    expected to contain a JSON list of questions. stream() yields the same
+    text in chunks as it is produced.
+    """
+    model_name = None
+
+    def generation_params(self):
+        """
+        Parameters that influence the response (part of the cache key).
+        """
+        return {}
+
+    def generate(self, prompt):
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        """
+        Yield the response text in chunks as it arrives. Backends without
+        native streaming return the whole response as a single chunk.
+        """
+        yield self.generate(prompt)
+
+
+class GeminiQuestionGenerator(QuestionGenerator):
+    """
+    Google Gemini backend.
+
+    The client is configured once per process and shared. Every call is
+    bounded by a deadline, retried with jittered exponential backoff on
+    transient errors, and limited by a process-wide semaphore so bursts
+    cannot open unbounded concurrent API calls.
+    """
+    model_name = 'gemini-2.5-flash'
+
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY)
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # Imported on first use, so processes that never call
+                    # Gemini (e.g. the web server) do not load the SDK
+                    try:
+                        import google.generativeai as genai
+                    except ImportError:
+                        raise RuntimeError("Google Gemini module (google-generativeai) not installed or not available.")
+
+                    api_key = os.environ.get("GEMINI_API_KEY")
+                    if not api_key:
+                        raise RuntimeError("GEMINI_API_KEY environment variable not set.")
+
+                    genai.configure(api_key=api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt):
+        print(f"Generating questions with Gemini ({self.model_name})...")
+        response = self._request(prompt)
+        return self._response_text(response)
+
+    def stream(self, prompt):
+        print(f"Streaming questions from Gemini ({self.model_name})...")
+        response = self._request(prompt, stream=True)
+        try:
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. the final finish chunk)
+                    continue
+                if text:
+                    yield text
+        finally:
+            self._semaphore.release()
+
+    def _request(self, prompt, stream=False):
+        """
+        Send the request, retrying transient errors until the deadline.
+        A concurrency slot is held for each attempt; for streamed requests
+        it stays held after returning and is released by the caller once
+        the stream has been consumed.
+        """
+        model = self._get_model()
+        deadline = time.monotonic() + settings.GEMINI_DEADLINE_SECONDS
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            timeout = min(settings.GEMINI_TIMEOUT_SECONDS, remaining)
+            self._semaphore.acquire()
+            started = time.monotonic()
+            try:
+                response = model.generate_content(
+                    prompt,
+                    stream=stream,
+                    request_options={'timeout': timeout}
+                )
+            except Exception as e:
+                self._semaphore.release()
+                gemini_request_seconds.observe(time.monotonic() - started, outcome='error')
+                attempt += 1
+                backoff = min(
+                    settings.GEMINI_BACKOFF_MAX_SECONDS,
+                    settings.GEMINI_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1))
+                ) * random.uniform(0.5, 1.5)
+                retryable = self._is_retryable(e) and attempt <= settings.GEMINI_MAX_RETRIES
+                if not retryable or time.monotonic() + backoff >= deadline:
+                    print(f"❌ Gemini API error during content generation: {str(e)}")
+                    raise RuntimeError(f"Gemini API failed to generate content: {str(e)}")
+                print(f"⚠️ Gemini API error (attempt {attempt}), retrying in {backoff:.1f}s: {str(e)}")
+                gemini_retries_total.inc()
+                time.sleep(backoff)
+                continue
+
+            gemini_request_seconds.observe(time.monotonic() - started, outcome='ok')
+
+            if not stream:
+                self._semaphore.release()
+            return response
+
+    def _is_retryable(self, error):
+        try:
+            from google.api_core import exceptions as api_exceptions
+        except ImportError:
+            return not isinstance(error, ValueError)
+        return isinstance(error, (
+            api_exceptions.TooManyRequests,
+            api_exceptions.ResourceExhausted,
+            api_exceptions.ServiceUnavailable,
+            api_exceptions.InternalServerError,
+            api_exceptions.DeadlineExceeded,
+        )) or isinstance(error, (TimeoutError, ConnectionError))
+
+    def _response_text(self, response):
+        """
+        Extract the response text. Raises ValueError for empty responses.
+        """
+        try:
+            if not response or not hasattr(response, 'text'):
+                print(f"❌ Gemini returned response without text property. Response object: {type(response)}")
+                if hasattr(response, 'candidates') and response.candidates:
+                    print(f"Response has {len(response.candidates)} candidates")
+                    if hasattr(response.candidates[0], 'content'):
+                        print(f"First candidate content: {response.candidates[0].content}")
+                raise ValueError("Gemini API returned response without text content.")
+
+            response_text = response.text.strip()
+
+            if not response_text:
+                print(f"❌ Gemini returned empty text")
+                raise ValueError("Gemini API returned empty response text.")
+
+        except AttributeError as e:
+            print(f"❌ Error accessing response.text: {str(e)}")
+            print(f"Response object type: {type(response)}")
+            print(f"Response object attributes: {dir(response)}")
+            raise RuntimeError(f"Gemini response format error: {str(e)}")
+
+        return response_text
+
+
+class StubQuestionGenerator(QuestionGenerator):
+    """
+    Deterministic offline backend for load tests and CI.
+
+    Builds well-formed questions from the words of the prompt's transcript;
+    the same prompt always yields the same questions. No network access.
+    """
+    model_name = 'stub'
+
+    STREAM_CHUNK_SIZE = 64
+
+    COUNT_RE = re.compile(r'erstelle (\d+)')
+    WORD_RE = re.compile(r'\w{4,}')
+
+    def generate(self, prompt):
+        match = self.COUNT_RE.search(prompt)
+        count = int(match.group(1)) if match else 10
+        transcript = prompt.split('Transkript:', 1)[-1].split('Bitte erstelle', 1)[0]
+        words = self.WORD_RE.findall(transcript) or ['Thema']
+        rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+
+        questions = []
+        for idx in range(count):
+            subject = rng.choice(words)
+            options = [f'{subject} {rng.choice(words)} {n}' for n in range(4)]
+            questions.append({
+                'question': f'Frage {idx + 1}: Was sagt das Video über „{subject}“ ({rng.randrange(10 ** 6)})?',
+                'options': options,
+                'correct_answer': options[rng.randrange(4)],
+            })
+        return json.dumps(questions, ensure_ascii=False)
+
+    def stream(self, prompt):
+        text = self.generate(prompt)
+        for start in range(0, len(text), self.STREAM_CHUNK_SIZE):
+            yield text[start:start + self.STREAM_CHUNK_SIZE]
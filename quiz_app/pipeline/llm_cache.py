@@ -0,0 +1,72 @@
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import GenerationCache
+
+
+def fingerprint(model_name, prompt, params=None):
+    """
+    Stable hash of everything that determines a model response.
+    """
+    payload = json.dumps(
+        {'model': model_name, 'prompt': prompt, 'params': params or {}},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def lookup(key):
+    """
+    Return the cached question list for the fingerprint, or None if there
+    is no entry or it has expired.
+    """
+    now = timezone.now()
+    try:
+        entry = GenerationCache.objects.filter(fingerprint=key, expires_at__gt=now).only('pk', 'questions').first()
+        if entry is None:
+            return None
+        GenerationCache.objects.filter(pk=entry.pk).update(last_used_at=now, hits=F('hits') + 1)
+    except DatabaseError as e:
+        print(f"⚠️ LLM cache lookup failed: {str(e)}")
+        return None
+    return entry.questions
+
+
+def store(key, model_name, questions):
+    """
+    Store a question list and evict expired and least recently used entries
+    beyond LLM_CACHE_MAX_ENTRIES.
+    """
+    now = timezone.now()
+    values = {
+        'model_name': model_name,
+        'questions': questions,
+        'last_used_at': now,
+        'expires_at': now + timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS),
+    }
+    try:
+        if not GenerationCache.objects.filter(fingerprint=key).update(**values):
+            GenerationCache.objects.create(fingerprint=key, **values)
+        _evict(now)
+    except IntegrityError:
+        # Stored concurrently by another worker
+        pass
+    except DatabaseError as e:
+        # The cache is an optimization - never fail a generation because of it
+        print(f"⚠️ Could not store LLM response in cache: {str(e)}")
+
+
+def _evict(now):
+    GenerationCache.objects.filter(expires_at__lte=now).delete()
+    overflow = GenerationCache.objects.count() - settings.LLM_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        stale_ids = list(
+            GenerationCache.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+        )
+        GenerationCache.objects.filter(pk__in=stale_ids).delete()
@@ -0,0 +1,633 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from ..metrics import cache_requests_total, pipeline_failures_total, pipeline_run_seconds
+from ..models import PipelineRun, PipelineWorker, Quiz, QuizGenerationJob, TranscriptCache
+from ..persistence import add_questions, create_quiz_with_questions
+from .audio import SAMPLE_RATE, decode_audio
+from .generation import QUESTION_COUNT, generate_questions
+from .singleflight import single_flight
+from .timing import StageTimer
+from .transcription import transcribe_parallel
+from .whisper_registry import whisper_models
+from .youtube import SOURCE_WHISPER, extract_video_id, parse_captions, select_caption_track
+
+
+class QuizPipeline:
+    """
+    Runs the quiz creation pipeline for a YouTube URL:
+    download -> transcription -> question generation -> persistence.
+
+    If a job is given, its stage and the progress within the stage are
+    updated as the pipeline advances.
+    Questions are persisted as they are generated, so the job points at the
+    quiz from its first question on.
+    force_regenerate bypasses the LLM response cache and the sharing of
+    results with concurrent runs for the same video.
+    """
+    # Extra yt-dlp options (e.g. enable_file_urls for local benchmarks)
+    ydl_options = {}
+
+    def __init__(self, job=None, force_regenerate=False):
+        self.job = job
+        self.force_regenerate = force_regenerate
+        self.timer = StageTimer()
+        self.quiz = None
+        self._progress_written_at = 0.0
+
+    def run(self, user, youtube_url):
+        """
+        Run the full pipeline and return the created Quiz.
+        Raises exception on failure.
+        """
+        self._set_stage(QuizGenerationJob.STAGE_METADATA)
+        video_id = extract_video_id(youtube_url)
+        if video_id and not self.force_regenerate:
+            key = f'video:{video_id}:{settings.WHISPER_MODEL_SIZE}:{settings.WHISPER_LANGUAGE}'
+            result = single_flight(key, lambda: self._extract_and_generate(user, youtube_url))
+        else:
+            result = self._extract_and_generate(user, youtube_url)
+
+        if self.quiz is not None:
+            # This run generated the questions and already persisted them
+            return self.quiz
+
+        # Result shared by a concurrent run for the same video
+        self._set_stage(QuizGenerationJob.STAGE_SAVING)
+        with self.timer.stage('persist'):
+            return self._save_quiz(user, youtube_url, result['video_info'], result['questions'])
+
+    def _extract_and_generate(self, user, youtube_url):
+        """
+        Run the expensive stages (download, transcription, generation).
+        The result is JSON-serializable so it can be shared with concurrent
+        requests for the same video.
+        """
+        video_info = self._extract_video_info(youtube_url)
+
+        self._set_stage(QuizGenerationJob.STAGE_GENERATING)
+        questions_data = self._generate_questions(user, youtube_url, video_info)
+
+        return {'video_info': video_info, 'questions': questions_data}
+
+    def _set_stage(self, stage):
+        if self.job is None:
+            return
+        self.job.stage = stage
+        self.job.progress = 0
+        self.job.save(update_fields=['stage', 'progress', 'updated_at'])
+
+    def _set_progress(self, percent):
+        """
+        Record the progress of the current stage. Writes are throttled to
+        JOB_PROGRESS_MIN_INTERVAL, except for reaching 100 percent.
+        """
+        if self.job is None:
+            return
+        percent = max(0, min(100, int(percent)))
+        now = time.monotonic()
+        if percent == self.job.progress:
+            return
+        if percent < 100 and now - self._progress_written_at < settings.JOB_PROGRESS_MIN_INTERVAL:
+            return
+        self._progress_written_at = now
+        self.job.progress = percent
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(
+            progress=percent,
+            updated_at=timezone.now()
+        )
+
+    def _download_progress(self, status):
+        """
+        yt-dlp progress hook.
+        """
+        if status.get('status') != 'downloading':
+            return
+        total = status.get('total_bytes') or status.get('total_bytes_estimate')
+        if total:
+            self._set_progress(status.get('downloaded_bytes', 0) * 100 / total)
+
+    def _save_quiz(self, user, youtube_url, video_info, questions_data):
+        """
+        Persist the quiz with its questions and answers.
+        """
+        return create_quiz_with_questions(
+            user=user,
+            title=video_info['title'],
+            youtube_url=youtube_url,
+            questions_data=questions_data,
+            description=video_info.get('description', ''),
+            transcript=video_info.get('transcript', ''),
+            transcript_source=video_info.get('transcript_source', SOURCE_WHISPER)
+        )
+
+    def _start_quiz(self, user, youtube_url, video_info):
+        """
+        Create the (still empty) quiz when the first question arrives and
+        link it to the job, so clients can load it while it is filling up.
+        """
+        quiz = create_quiz_with_questions(
+            user=user,
+            title=video_info['title'],
+            youtube_url=youtube_url,
+            questions_data=[],
+            description=video_info.get('description', ''),
+            transcript=video_info.get('transcript', ''),
+            transcript_source=video_info.get('transcript_source', SOURCE_WHISPER)
+        )
+        if self.job is not None:
+            self.job.quiz = quiz
+            self.job.save(update_fields=['quiz', 'updated_at'])
+        return quiz
+
+    def _extract_video_info(self, youtube_url):
+        """
+        Extract video information from YouTube URL using yt-dlp.
+        Downloads audio and returns video metadata with transcript.
+        Transcripts are cached per video ID, so a cached video skips the
+        download and transcription completely. If the video has captions in
+        the target language, those are used instead of Whisper.
+        Raises exception on failure.
+        """
+        video_id = extract_video_id(youtube_url)
+        cached = self._get_cached_transcript(video_id)
+        if video_id:
+            cache_requests_total.inc(cache='transcript', result='miss' if cached is None else 'hit')
+        if cached is not None:
+            print(f"✅ Using cached transcript for video {video_id}")
+            return cached.to_video_info()
+
+        try:
+            import yt_dlp
+        except ImportError:
+            raise RuntimeError("yt-dlp not installed or not available.")
+
+        temp_dir = None
+        try:
+            temp_dir = tempfile.mkdtemp()
+            ydl_opts = {
+                'quiet': True,
+                'no_warnings': True,
+                'format': 'bestaudio/best',
+                'outtmpl': os.path.join(temp_dir, '%(id)s.%(ext)s'),
+                'progress_hooks': [self._download_progress],
+            }
+            ydl_opts.update(self.ydl_options)
+            if settings.AUDIO_INGEST_MODE == 'mp3':
+                ydl_opts['postprocessors'] = [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'mp3',
+                    'preferredquality': '192',
+                }]
+
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with self.timer.stage('metadata'):
+                    info = ydl.extract_info(youtube_url, download=False)
+
+                if settings.USE_YOUTUBE_CAPTIONS:
+                    transcript, source = self._fetch_captions(ydl, info)
+                    cache_requests_total.inc(cache='captions', result='hit' if transcript else 'miss')
+                    if transcript:
+                        print(f"✅ Using YouTube captions ({source}), skipping download and Whisper")
+                        video_info = self._build_video_info(info, transcript, source)
+                        self._store_transcript(video_id, video_info)
+                        return video_info
+
+                self._set_stage(QuizGenerationJob.STAGE_DOWNLOADING)
+                print(f"Downloading audio from {youtube_url}...")
+                with self.timer.stage('download'):
+                    info = ydl.process_ie_result(info, download=True)
+
+                audio_file = self._find_audio_file(temp_dir)
+                if not audio_file:
+                    raise RuntimeError("Failed to download or convert audio file from YouTube.")
+                self.timer.record('download', temp_disk_bytes=os.path.getsize(audio_file))
+
+                if settings.AUDIO_INGEST_MODE == 'pcm':
+                    # Decode the native stream (m4a/webm) directly to 16 kHz
+                    # PCM in memory instead of transcoding to MP3 first
+                    with self.timer.stage('decode'):
+                        audio = decode_audio(audio_file)
+                else:
+                    audio = audio_file
+
+                self._set_stage(QuizGenerationJob.STAGE_TRANSCRIBING)
+                print(f"Transcribing audio: {audio_file}...")
+                with self.timer.stage('transcribe'):
+                    transcript = self._transcribe_audio(audio)
+                print(f"⏱️ Ingestion ({settings.AUDIO_INGEST_MODE}): {self.timer.summary()}")
+
+                video_info = self._build_video_info(info, transcript, SOURCE_WHISPER)
+                self._store_transcript(video_id, video_info)
+                return video_info
+        finally:
+            if temp_dir and os.path.exists(temp_dir):
+                try:
+                    shutil.rmtree(temp_dir)
+                except:
+                    pass
+
+    def _build_video_info(self, info, transcript, source):
+        return {
+            'title': info.get('title', 'Untitled Video'),
+            'description': (info.get('description') or '')[:500],
+            'duration': int(info.get('duration') or 0),
+            'uploader': info.get('uploader') or 'Unknown',
+            'transcript': transcript,
+            'transcript_source': source,
+        }
+
+    def _fetch_captions(self, ydl, info):
+        """
+        Fetch existing YouTube captions in the target language.
+        Returns (transcript, source), or (None, None) if there are no usable
+        captions and the audio has to be transcribed.
+        """
+        source, track = select_caption_track(info, settings.WHISPER_LANGUAGE)
+        if track is None:
+            return None, None
+
+        try:
+            with self.timer.stage('captions'):
+                raw = ydl.urlopen(track['url']).read().decode('utf-8', errors='replace')
+                transcript = parse_captions(raw, track['ext'])
+        except Exception as e:
+            print(f"⚠️ Could not use captions, falling back to Whisper: {str(e)}")
+            return None, None
+
+        if len(transcript) < settings.MIN_CAPTION_TRANSCRIPT_LENGTH:
+            return None, None
+        return transcript, source
+
+    def _find_audio_file(self, temp_dir):
+        """
+        Return the downloaded audio file in temp_dir (ignoring partial downloads).
+        """
+        for file in sorted(os.listdir(temp_dir)):
+            if file.endswith(('.part', '.ytdl')):
+                continue
+            if settings.AUDIO_INGEST_MODE == 'mp3' and not file.endswith('.mp3'):
+                continue
+            return os.path.join(temp_dir, file)
+        return None
+
+    def _get_cached_transcript(self, video_id):
+        """
+        Return the cached transcript entry for the video, or None.
+        """
+        if not video_id:
+            return None
+        return TranscriptCache.objects.filter(
+            video_id=video_id,
+            model_size=settings.WHISPER_MODEL_SIZE,
+            language=settings.WHISPER_LANGUAGE
+        ).first()
+
+    def _store_transcript(self, video_id, video_info):
+        """
+        Store the transcript of a video for later requests.
+        """
+        if not video_id:
+            return
+        try:
+            TranscriptCache.objects.get_or_create(
+                video_id=video_id,
+                model_size=settings.WHISPER_MODEL_SIZE,
+                language=settings.WHISPER_LANGUAGE,
+                defaults={
+                    'title': video_info['title'][:255],
+                    'description': video_info['description'],
+                    'duration': video_info['duration'],
+                    'uploader': video_info['uploader'][:255],
+                    'transcript': video_info['transcript'],
+                    'source': video_info['transcript_source'],
+                }
+            )
+        except IntegrityError:
+            # Another worker stored the same video concurrently
+            pass
+
+    def _transcribe_audio(self, audio):
+        """
+        Transcribe audio using Whisper AI. Accepts a file path or a 16 kHz
+        mono float32 PCM array. Long PCM audio is split at silence and
+        transcribed in parallel across a process pool.
+        Raises exception on failure.
+        """
+        workers = settings.WHISPER_PARALLEL_WORKERS
+        if (
+            workers > 1
+            and not isinstance(audio, str)
+            and len(audio) / SAMPLE_RATE >= settings.WHISPER_PARALLEL_MIN_SECONDS
+        ):
+            print(f"Transcribing audio in parallel chunks ({workers} processes)...")
+            transcript = transcribe_parallel(
+                audio,
+                model_size=settings.WHISPER_MODEL_SIZE,
+                language=settings.WHISPER_LANGUAGE,
+                workers=workers,
+                chunk_seconds=settings.WHISPER_CHUNK_SECONDS,
+                search_seconds=settings.WHISPER_CHUNK_SEARCH_SECONDS,
+                on_chunk_done=lambda done, total: self._set_progress(done * 100 / total)
+            )
+        else:
+            model = whisper_models.get(settings.WHISPER_MODEL_SIZE)
+            print("Transcribing audio...")
+            result = model.transcribe(audio, language=settings.WHISPER_LANGUAGE)
+            transcript = result.get('text', '')
+
+        if not transcript:
+            raise ValueError("Whisper transcription returned empty result.")
+
+        print(f"✅ Transcription completed: {len(transcript)} characters")
+        return transcript
+
+    def _generate_questions(self, user, youtube_url, video_info):
+        """
+        Generate quiz questions with the configured generator backend
+        (Google Gemini by default) and persist each one as soon as it is
+        complete. A partially persisted quiz is removed if generation fails.
+        Raises exception if AI is unavailable or fails - no fallback.
+        """
+        started = time.perf_counter()
+
+        def on_question(q_data, index):
+            if self.quiz is None:
+                self.timer.record('generate', first_question_s=time.perf_counter() - started)
+            # Persisting is timed per question but observed once per run
+            with self.timer.stage('persist', observe=False):
+                if self.quiz is None:
+                    self.quiz = self._start_quiz(user, youtube_url, video_info)
+                add_questions(self.quiz, [q_data], start_order=index)
+            self._set_progress((index + 1) * 100 / QUESTION_COUNT)
+
+        try:
+            with self.timer.stage('generate'):
+                return generate_questions(
+                    video_info,
+                    use_cache=not self.force_regenerate,
+                    on_question=on_question
+                )
+        except Exception:
+            if self.quiz is not None:
+                self.quiz.delete()
+                self.quiz = None
+            raise
+        finally:
+            self.timer.observe('persist')
+
+
+def run_job(job_id):
+    """
+    Run a claimed QuizGenerationJob to completion and record the outcome.
+    """
+    job = QuizGenerationJob.objects.select_related('user').get(pk=job_id)
+    pipeline = QuizPipeline(job=job, force_regenerate=job.force_regenerate)
+    started = time.perf_counter()
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(job.pk, stop), daemon=True)
+    heartbeat.start()
+    try:
+        quiz = pipeline.run(job.user, job.youtube_url)
+    except Exception as e:
+        import traceback
+        print(f"❌ Error in quiz generation job {job.pk}: {traceback.format_exc()}")
+        _record_run(
+            job, pipeline, PipelineRun.STATUS_FAILED, time.perf_counter() - started,
+            failed_stage=pipeline.timer.failed_stage(e)
+        )
+        job.status = QuizGenerationJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+        return job
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    _record_run(job, pipeline, PipelineRun.STATUS_SUCCEEDED, time.perf_counter() - started)
+    job.status = QuizGenerationJob.STATUS_SUCCEEDED
+    job.stage = QuizGenerationJob.STAGE_DONE
+    job.quiz = quiz
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'stage', 'quiz', 'finished_at', 'updated_at'])
+    return job
+
+
+def _heartbeat(job_id, stop):
+    interval = settings.JOB_LEASE_SECONDS / 3
+    try:
+        while not stop.wait(interval):
+            QuizGenerationJob.objects.filter(
+                pk=job_id,
+                status=QuizGenerationJob.STATUS_RUNNING
+            ).update(heartbeat_at=timezone.now())
+    finally:
+        connection.close()
+
+
+def run_job_in_thread(job_id):
+    """
+    Run a job on a pool thread and release the thread's DB connection
+    afterwards.
+    """
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def report_worker(name):
+    """
+    Refresh this worker's PipelineWorker row with its loaded Whisper models.
+    Rows of workers that missed their heartbeat for JOB_LEASE_SECONDS are
+    removed.
+    """
+    now = timezone.now()
+    PipelineWorker.objects.update_or_create(
+        name=name,
+        defaults={'loaded_models': whisper_models.loaded_sizes(), 'heartbeat_at': now}
+    )
+    PipelineWorker.objects.filter(
+        heartbeat_at__lt=now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    ).delete()
+
+
+def remove_worker(name):
+    PipelineWorker.objects.filter(name=name).delete()
+
+
+def preload_whisper():
+    """
+    Load the configured Whisper model if WHISPER_PRELOAD is set. Called by
+    the processes that transcribe (run_quiz_worker, inline executor), never
+    by the web tier itself.
+    """
+    if settings.WHISPER_PRELOAD:
+        whisper_models.preload([settings.WHISPER_MODEL_SIZE])
+
+
+_inline_executor = None
+_inline_executor_lock = threading.Lock()
+
+
+def submit_inline_job(job_id):
+    """
+    Run a pending job in this process on the dedicated pipeline executor
+    with QUIZ_INLINE_WORKERS threads. Used by the web process instead of
+    run_quiz_worker when inline workers are configured; the blocking stages
+    never run on the event loop of the async views.
+
+    The job is claimed like a worker claims it, so it stays in the queue
+    until then (a restart of the web process does not lose it).
+    """
+    global _inline_executor
+    with _inline_executor_lock:
+        if _inline_executor is None:
+            _inline_executor = ThreadPoolExecutor(
+                max_workers=settings.QUIZ_INLINE_WORKERS,
+                thread_name_prefix='quiz-pipeline',
+                initializer=preload_whisper
+            )
+    return _inline_executor.submit(_run_inline, job_id)
+
+
+def _run_inline(job_id):
+    """
+    Claim and run the job, then keep claiming queued jobs until the queue
+    is empty. That picks up jobs left behind by a previous process (and,
+    through claim_jobs, recovers stale ones) without a separate worker.
+    """
+    try:
+        if not claim_job(job_id):
+            job_id = None  # already taken by a worker
+        while True:
+            if job_id is None:
+                claimed = claim_jobs(1)
+                if not claimed:
+                    return
+                job_id = claimed[0]
+            run_job_in_thread(job_id)
+            job_id = None
+    finally:
+        close_old_connections()
+
+
+def _record_run(job, pipeline, status, total_seconds, failed_stage=''):
+    """
+    Store the stage timings of a finished run and update the run metrics.
+    A failed run is attributed to the timing stage it failed in, so failures
+    and stage latencies share the `stage` label.
+    """
+    pipeline_run_seconds.observe(total_seconds, status=status)
+    if failed_stage:
+        pipeline_failures_total.inc(stage=failed_stage)
+    print(f"⏱️ Job {job.pk} {status} in {total_seconds:.2f}s: {pipeline.timer.summary()}")
+    try:
+        PipelineRun.objects.create(
+            job=job,
+            youtube_url=job.youtube_url,
+            status=status,
+            failed_stage=failed_stage,
+            stage_timings=pipeline.timer.stages,
+            total_seconds=total_seconds
+        )
+    except DatabaseError as e:
+        print(f"⚠️ Could not record pipeline run: {str(e)}")
+
+
+def claim_jobs(limit):
+    """
+    Atomically claim up to `limit` pending jobs, oldest first.
+
+    Claiming is a conditional UPDATE on the pending status, so several worker
+    processes can poll the same table without running a job twice. Jobs of
+    workers that stopped sending heartbeats are recovered first.
+    """
+    if limit <= 0:
+        return []
+    recover_stale_jobs()
+
+    claimed = []
+    candidate_ids = QuizGenerationJob.objects.filter(
+        status=QuizGenerationJob.STATUS_PENDING
+    ).order_by('created_at').values_list('id', flat=True)[:limit * 2]
+
+    for job_id in candidate_ids:
+        if claim_job(job_id):
+            claimed.append(job_id)
+            if len(claimed) >= limit:
+                break
+    return claimed
+
+
+def claim_job(job_id):
+    """
+    Claim a single pending job. Returns False if it is no longer pending.
+    """
+    now = timezone.now()
+    return QuizGenerationJob.objects.filter(
+        pk=job_id,
+        status=QuizGenerationJob.STATUS_PENDING
+    ).update(
+        status=QuizGenerationJob.STATUS_RUNNING,
+        started_at=now,
+        heartbeat_at=now,
+        attempts=F('attempts') + 1,
+        updated_at=now
+    ) > 0
+
+
+def recover_stale_jobs():
+    """
+    Queue running jobs whose heartbeat is older than JOB_LEASE_SECONDS
+    again (their worker crashed or was restarted), or fail them once they
+    have used up JOB_MAX_ATTEMPTS. A partially saved quiz is deleted, the
+    next attempt starts from scratch.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    stale = QuizGenerationJob.objects.filter(
+        status=QuizGenerationJob.STATUS_RUNNING,
+        heartbeat_at__lt=cutoff
+    ).values_list('id', 'attempts', 'quiz_id')
+
+    recovered = []
+    for job_id, attempts, quiz_id in stale:
+        if attempts < settings.JOB_MAX_ATTEMPTS:
+            changes = {
+                'status': QuizGenerationJob.STATUS_PENDING,
+                'stage': QuizGenerationJob.STAGE_QUEUED,
+            }
+        else:
+            changes = {
+                'status': QuizGenerationJob.STATUS_FAILED,
+                'error': 'The worker running this job stopped responding.',
+                'finished_at': timezone.now(),
+            }
+        updated = QuizGenerationJob.objects.filter(
+            pk=job_id,
+            status=QuizGenerationJob.STATUS_RUNNING,
+            heartbeat_at__lt=cutoff
+        ).update(quiz=None, progress=0, updated_at=timezone.now(), **changes)
+        if not updated:
+            continue
+        if quiz_id is not None:
+            Quiz.objects.filter(pk=quiz_id).delete()
+        print(f"⚠️ Job {job_id} lost its worker, {changes['status']} (attempt {attempts})")
+        recovered.append(job_id)
+    return recovered
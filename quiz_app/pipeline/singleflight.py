@@ -0,0 +1,157 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from ..models import PipelineFlight
+
+
+class FlightFailed(RuntimeError):
+    """
+    Raised for callers that attached to a flight whose leader failed.
+    """
+
+
+def single_flight(key, fn):
+    """
+    Run fn() at most once at a time per key across all worker processes.
+
+    The first caller becomes the leader, runs fn() and stores its
+    JSON-serializable result on a PipelineFlight row. Callers arriving while
+    the flight is running (or shortly after it finished) wait for and return
+    the leader's result instead of repeating the work. If the leader stops
+    sending heartbeats, the next caller takes the flight over.
+    """
+    while True:
+        flight, is_leader = _acquire(key)
+        if is_leader:
+            return _lead(flight, fn)
+
+        print(f"Attaching to in-flight pipeline run for {key}...")
+        flight = _wait(flight)
+        if flight is None:
+            # Leader went away - try to take over
+            continue
+        if flight.status == PipelineFlight.STATUS_FAILED:
+            raise FlightFailed(flight.error or f"Pipeline run for {key} failed.")
+        return flight.result
+
+
+def _acquire(key):
+    """
+    Return (flight, is_leader) for the key, creating or taking over the row
+    when there is no usable flight.
+    """
+    while True:
+        now = timezone.now()
+        token = uuid.uuid4()
+        try:
+            with transaction.atomic():
+                flight = PipelineFlight.objects.create(
+                    key=key,
+                    token=token,
+                    heartbeat_at=now
+                )
+            return flight, True
+        except IntegrityError:
+            pass
+
+        existing = PipelineFlight.objects.filter(key=key).first()
+        if existing is None:
+            continue
+
+        if not _is_reusable(existing, now):
+            taken = PipelineFlight.objects.filter(
+                pk=existing.pk,
+                token=existing.token
+            ).update(
+                token=token,
+                status=PipelineFlight.STATUS_RUNNING,
+                result=None,
+                error='',
+                heartbeat_at=now,
+                expires_at=None
+            )
+            if taken:
+                return PipelineFlight.objects.get(pk=existing.pk), True
+            continue
+
+        return existing, False
+
+
+def _is_reusable(flight, now):
+    """
+    A flight can be attached to while it is running with a live leader, or
+    within the linger window after it succeeded.
+    """
+    if flight.status == PipelineFlight.STATUS_RUNNING:
+        lease = timedelta(seconds=settings.SINGLE_FLIGHT_LEASE_SECONDS)
+        return flight.heartbeat_at + lease > now
+    if flight.status == PipelineFlight.STATUS_SUCCEEDED:
+        return flight.expires_at is not None and flight.expires_at > now
+    return False
+
+
+def _lead(flight, fn):
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat,
+        args=(flight.pk, flight.token, stop),
+        daemon=True
+    )
+    heartbeat.start()
+    try:
+        result = fn()
+    except Exception as e:
+        stop.set()
+        heartbeat.join()
+        PipelineFlight.objects.filter(pk=flight.pk, token=flight.token).update(
+            status=PipelineFlight.STATUS_FAILED,
+            error=str(e),
+            expires_at=timezone.now()
+        )
+        raise
+
+    stop.set()
+    heartbeat.join()
+    now = timezone.now()
+    PipelineFlight.objects.filter(pk=flight.pk, token=flight.token).update(
+        status=PipelineFlight.STATUS_SUCCEEDED,
+        result=result,
+        expires_at=now + timedelta(seconds=settings.SINGLE_FLIGHT_LINGER_SECONDS)
+    )
+    PipelineFlight.objects.filter(expires_at__lt=now).exclude(
+        status=PipelineFlight.STATUS_RUNNING
+    ).delete()
+    return result
+
+
+def _heartbeat(flight_pk, token, stop):
+    interval = settings.SINGLE_FLIGHT_LEASE_SECONDS / 3
+    try:
+        while not stop.wait(interval):
+            PipelineFlight.objects.filter(pk=flight_pk, token=token).update(
+                heartbeat_at=timezone.now()
+            )
+    finally:
+        connection.close()
+
+
+def _wait(flight):
+    """
+    Poll until the flight finishes. Returns the finished flight, or None if
+    the leader's lease expired or the flight was taken over.
+    """
+    current = flight
+    while True:
+        if current is None or current.token != flight.token:
+            return None
+        if current.status != PipelineFlight.STATUS_RUNNING:
+            return current
+        if not _is_reusable(current, timezone.now()):
+            return None
+        time.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+        current = PipelineFlight.objects.filter(pk=flight.pk).first()
@@ -0,0 +1,101 @@
+import time
+from contextlib import contextmanager
+
+from ..metrics import pipeline_stage_seconds
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _children_cpu_time():
+    """
+    CPU time of finished child processes (e.g. ffmpeg), 0 where unsupported.
+    """
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class StageTimer:
+    """
+    Collects wall time and CPU time per pipeline stage. Stage wall times are
+    also observed in the quiz_pipeline_stage_seconds histogram.
+
+    Time spent in a nested stage counts for that stage only, not for the
+    enclosing one. Stages entered with observe=False only accumulate; their
+    total is observed once with observe(name).
+
+    failed_stage(exc) names the stage a failure is attributed to, using the
+    same labels as the histogram.
+
+    CPU time includes child processes such as ffmpeg. It is measured
+    process-wide, so it is only exact when one job runs at a time (e.g. in
+    benchmarks).
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self._open = []
+        self._last = None
+        self._raised = None
+
+    @contextmanager
+    def stage(self, name, observe=True):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time() + _children_cpu_time()
+        nested = [0.0, 0.0]
+        self._open.append(nested)
+        self._last = name
+        try:
+            yield
+        except BaseException as e:
+            # The innermost stage the exception leaves is where it was raised
+            if self._raised is None or self._raised[0] is not e:
+                self._raised = (e, name)
+            raise
+        finally:
+            self._open.pop()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() + _children_cpu_time() - cpu_start
+            if self._open:
+                self._open[-1][0] += wall
+                self._open[-1][1] += cpu
+            wall -= nested[0]
+            entry = self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0})
+            entry['wall_s'] += wall
+            entry['cpu_s'] += cpu - nested[1]
+            if observe:
+                pipeline_stage_seconds.observe(wall, stage=name)
+
+    def observe(self, name):
+        """
+        Observe the accumulated wall time of a stage entered with
+        observe=False (once per run).
+        """
+        if name in self.stages:
+            pipeline_stage_seconds.observe(self.stages[name]['wall_s'], stage=name)
+
+    def failed_stage(self, exc):
+        """
+        Stage in which `exc` was raised. An exception raised between stages
+        is attributed to the last stage entered, or to 'other' before the
+        first stage.
+        """
+        if self._raised is not None and self._raised[0] is exc:
+            return self._raised[1]
+        return self._last or 'other'
+
+    def record(self, name, **values):
+        """
+        Attach extra measurements (e.g. bytes written) to a stage.
+        """
+        self.stages.setdefault(name, {'wall_s': 0.0, 'cpu_s': 0.0}).update(values)
+
+    def summary(self):
+        parts = []
+        for name, entry in self.stages.items():
+            parts.append(f"{name}: {entry['wall_s']:.2f}s wall / {entry['cpu_s']:.2f}s cpu")
+        return ', '.join(parts)
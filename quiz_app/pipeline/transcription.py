@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .audio import SAMPLE_RATE
+from .whisper_registry import whisper_models
+
+# Kept free of Django imports: this module is imported by spawned pool
+# processes, which only need Whisper.
+
+FRAME_SECONDS = 0.1
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+def split_at_silence(audio, chunk_seconds, search_seconds, sample_rate=SAMPLE_RATE):
+    """
+    Split a PCM array into chunks of roughly chunk_seconds.
+
+    Each cut is placed at the quietest 100 ms frame within search_seconds of
+    the target position, so chunk boundaries fall into pauses instead of
+    cutting words in half. Returns a list of (start, end) sample indices.
+    """
+    import numpy as np
+
+    total = len(audio)
+    chunk = int(chunk_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    frame = max(1, int(FRAME_SECONDS * sample_rate))
+
+    bounds = []
+    start = 0
+    while total - start > chunk + search:
+        window_start = start + chunk - search
+        window_end = start + chunk + search
+        window = audio[window_start:window_end]
+        frames = len(window) // frame
+        energy = np.sqrt(np.mean(window[:frames * frame].reshape(frames, frame) ** 2, axis=1))
+        cut = window_start + int(np.argmin(energy)) * frame + frame // 2
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, total))
+    return bounds
+
+
+def _init_worker(model_size, threads):
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    whisper_models.get(model_size)
+
+
+def _transcribe_chunk(model_size, language, chunk):
+    model = whisper_models.get(model_size)
+    result = model.transcribe(chunk, language=language)
+    return result.get('text', '').strip()
+
+
+def _get_pool(workers, model_size):
+    """
+    Return the process pool for the configuration, creating it on first use.
+    The pool is reused across jobs so each process loads the model once.
+    """
+    global _pool, _pool_key
+    with _pool_lock:
+        key = (workers, model_size)
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(model_size, threads)
+            )
+            _pool_key = key
+        return _pool
+
+
+def transcribe_parallel(audio, model_size, language, workers, chunk_seconds, search_seconds,
+                        on_chunk_done=None):
+    """
+    Transcribe a PCM array by splitting it at silence and transcribing the
+    chunks in parallel across a process pool. The chunk texts are stitched
+    back together in their original order.
+
+    on_chunk_done(done, total) is called after every finished chunk.
+    """
+    bounds = split_at_silence(audio, chunk_seconds, search_seconds)
+    pool = _get_pool(workers, model_size)
+    futures = {
+        pool.submit(_transcribe_chunk, model_size, language, audio[start:end]): idx
+        for idx, (start, end) in enumerate(bounds)
+    }
+
+    texts = [''] * len(bounds)
+    for done, future in enumerate(as_completed(futures), start=1):
+        texts[futures[future]] = future.result()
+        if on_chunk_done is not None:
+            on_chunk_done(done, len(bounds))
+    return ' '.join(text for text in texts if text)
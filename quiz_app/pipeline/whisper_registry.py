@@ -0,0 +1,63 @@
+import threading
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Each model size is loaded at most once per process and shared by all
+    requests afterwards. Loading is guarded by a per-size lock so concurrent
+    first requests wait for a single load instead of loading their own copy.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    def _lock_for(self, size):
+        with self._registry_lock:
+            if size not in self._locks:
+                self._locks[size] = threading.Lock()
+            return self._locks[size]
+
+    def get(self, size):
+        """
+        Return the model for the given size, loading it on first use.
+        """
+        model = self._models.get(size)
+        if model is not None:
+            return model
+
+        with self._lock_for(size):
+            model = self._models.get(size)
+            if model is None:
+                import whisper
+
+                print(f"Loading Whisper model '{size}'...")
+                model = whisper.load_model(size)
+                self._models[size] = model
+                print(f"✅ Whisper model '{size}' loaded")
+            return model
+
+    def preload(self, sizes):
+        """
+        Load all given model sizes eagerly (e.g. at process startup).
+        """
+        for size in sizes:
+            self.get(size)
+
+    def is_warm(self, size):
+        """
+        Return True if the model for the given size is already loaded.
+        """
+        return size in self._models
+
+    def loaded_sizes(self):
+        """
+        Return the sizes of all models loaded in this process.
+        """
+        return sorted(self._models)
+
+
+whisper_models = WhisperModelRegistry()
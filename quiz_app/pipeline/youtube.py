@@ -0,0 +1,159 @@
+import html
+import re
+from urllib.parse import urlparse, parse_qs
+from xml.etree import ElementTree
+
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+YOUTUBE_HOSTS = {
+    'youtube.com',
+    'www.youtube.com',
+    'm.youtube.com',
+    'music.youtube.com',
+    'youtube-nocookie.com',
+    'www.youtube-nocookie.com',
+}
+SHORT_HOSTS = {'youtu.be', 'www.youtu.be'}
+PATH_PREFIXES = ('shorts', 'embed', 'live', 'v', 'e')
+
+
+def extract_video_id(url):
+    """
+    Return the normalized 11-character YouTube video ID for a URL, or None.
+
+    Handles youtu.be short links, watch?v= URLs with extra query parameters
+    and the /shorts/, /embed/ and /live/ path forms, so different spellings of
+    the same video map to one ID.
+    """
+    try:
+        parsed = urlparse(url.strip())
+    except (AttributeError, ValueError):
+        return None
+
+    host = (parsed.hostname or '').lower()
+    path_parts = [part for part in parsed.path.split('/') if part]
+
+    candidate = None
+    if host in SHORT_HOSTS:
+        candidate = path_parts[0] if path_parts else None
+    elif host in YOUTUBE_HOSTS:
+        if path_parts[:1] == ['watch']:
+            candidate = parse_qs(parsed.query).get('v', [None])[0]
+        elif len(path_parts) >= 2 and path_parts[0] in PATH_PREFIXES:
+            candidate = path_parts[1]
+
+    if candidate and VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
+
+
+CAPTION_FORMAT_PREFERENCE = ('vtt', 'srv3', 'srv2', 'srv1')
+
+SOURCE_WHISPER = 'whisper'
+SOURCE_CAPTIONS_MANUAL = 'captions_manual'
+SOURCE_CAPTIONS_AUTO = 'captions_auto'
+
+VTT_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def select_caption_track(info, language):
+    """
+    Pick the best caption track of a yt-dlp info dict for the language.
+
+    Manual subtitles are preferred over automatic captions. Automatic
+    captions are only used in the video's original language (YouTube also
+    offers machine-translated tracks, which are too poor for quizzes).
+    Returns (source, track) where track has 'url' and 'ext', or (None, None).
+    """
+    manual = _find_tracks(info.get('subtitles') or {}, language)
+    track = _preferred_format(manual)
+    if track:
+        return SOURCE_CAPTIONS_MANUAL, track
+
+    automatic = info.get('automatic_captions') or {}
+    original_language = (info.get('language') or '').lower()
+    candidates = automatic.get(f'{language}-orig')
+    if not candidates and _matches_language(original_language, language):
+        candidates = _find_tracks(automatic, language)
+    track = _preferred_format(candidates or [])
+    if track:
+        return SOURCE_CAPTIONS_AUTO, track
+
+    return None, None
+
+
+def _matches_language(key, language):
+    key = key.lower()
+    return key == language or key.startswith(f'{language}-')
+
+
+def _find_tracks(tracks_by_language, language):
+    if language in tracks_by_language:
+        return tracks_by_language[language]
+    for key, tracks in tracks_by_language.items():
+        if _matches_language(key, language) and not key.endswith('-orig'):
+            return tracks
+    return []
+
+
+def _preferred_format(tracks):
+    for ext in CAPTION_FORMAT_PREFERENCE:
+        for track in tracks:
+            if track.get('ext') == ext and track.get('url'):
+                return track
+    return None
+
+
+def parse_captions(text, ext):
+    """
+    Convert a downloaded caption file (VTT or SRV XML) into plain text.
+    """
+    if ext == 'vtt':
+        lines = parse_vtt(text)
+    elif ext in ('srv1', 'srv2', 'srv3'):
+        lines = parse_srv(text)
+    else:
+        raise ValueError(f"Unsupported caption format: {ext}")
+    return ' '.join(lines)
+
+
+def parse_vtt(text):
+    """
+    Return the caption lines of a WebVTT file without timestamps, cue
+    settings or inline tags. Consecutive repeated lines (YouTube's rolling
+    automatic captions repeat the previous line in every cue) are collapsed.
+    """
+    lines = []
+    in_header_block = False
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            in_header_block = False
+            continue
+        if line.startswith('WEBVTT') or line.startswith(('NOTE', 'STYLE', 'REGION')):
+            in_header_block = True
+            continue
+        if in_header_block or '-->' in line or line.isdigit():
+            continue
+        if line.startswith(('Kind:', 'Language:')):
+            continue
+
+        line = html.unescape(VTT_TAG_RE.sub('', line)).strip()
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+    return lines
+
+
+def parse_srv(text):
+    """
+    Return the caption lines of a YouTube timedtext XML file (srv1/srv2/srv3).
+    """
+    root = ElementTree.fromstring(text)
+    lines = []
+    for element in root.iter():
+        if element.tag not in ('text', 'p'):
+            continue
+        line = html.unescape(' '.join(''.join(element.itertext()).split()))
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+    return lines
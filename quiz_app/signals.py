@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Answer, Question, Quiz
+
+
+def _deleted_directly(instance, origin):
+    """
+    True if `instance` itself (or a queryset of its model) was deleted, not
+    removed by a cascade from its parent. The parent's own delete signal
+    already covers cascades, and a deleted quiz has no version to bump.
+    """
+    model = getattr(origin, 'model', type(origin))
+    return model is type(instance)
+
+
+@receiver(post_save, sender=Answer)
+def touch_question_on_answer_change(sender, instance, **kwargs):
+    """
+    Answers have no timestamp of their own; bump the parent question and
+    quiz so quiz ETags and Last-Modified change when an answer is edited
+    (e.g. in the admin).
+    """
+    now = timezone.now()
+    Question.objects.filter(pk=instance.question_id).update(updated_at=now)
+    Quiz.objects.filter(questions=instance.question_id).update(updated_at=now)
+
+
+@receiver(post_delete, sender=Answer)
+def touch_question_on_answer_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(instance, origin):
+        touch_question_on_answer_change(sender, instance)
+
+
+@receiver(post_save, sender=Question)
+def touch_quiz_on_question_change(sender, instance, **kwargs):
+    """
+    Bump the quiz so Last-Modified moves when a question is added, edited
+    or removed, not only the ETag.
+    """
+    Quiz.objects.filter(pk=instance.quiz_id).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Question)
+def touch_quiz_on_question_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(instance, origin):
+        touch_quiz_on_question_change(sender, instance)
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+from rest_framework.permissions import AllowAny, BasePermission
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from rest_framework.throttling import BaseThrottle
+
+from quiz_app.api.base import AsyncAPIView
+from quiz_app.models import Answer, Question, Quiz
+from quiz_app.persistence import add_questions, create_quiz_with_questions
+
+QUESTIONS = [{'question': 'Frage?', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': 'A'}]
+
+
+@override_settings(QUIZ_INLINE_WORKERS=0)
+class MalformedRequestTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('api-test', 'api@example.com', 'x')
+        self.client.force_authenticate(self.user)
+
+    def post_raw(self, method, path, body):
+        return getattr(self.client, method)(path, data=body, content_type='application/json')
+
+    def test_malformed_json_on_create_is_a_bad_request(self):
+        response = self.post_raw('post', '/api/quizzes/', '{"url": ')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+    def test_malformed_json_on_update_is_a_bad_request(self):
+        quiz = create_quiz_with_questions(self.user, 'Quiz', 'https://youtu.be/x', QUESTIONS)
+
+        response = self.post_raw('patch', f'/api/quizzes/{quiz.id}/', '{"title": "Neu",}')
+
+        self.assertEqual(response.status_code, 400)
+        quiz.refresh_from_db()
+        self.assertEqual(quiz.title, 'Quiz')
+
+    def test_anonymous_request_is_unauthorized(self):
+        self.client.force_authenticate(None)
+
+        response = self.client.get('/api/quizzes/')
+
+        self.assertEqual(response.status_code, 401)
+
+
+class SparseFieldsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('fields-test', 'fields@example.com', 'x')
+        self.client.force_authenticate(self.user)
+        create_quiz_with_questions(self.user, 'Quiz', 'https://youtu.be/x', QUESTIONS)
+
+    def test_known_fields_are_returned(self):
+        response = self.client.get('/api/quizzes/?fields=id,title')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+
+    def test_unknown_fields_are_rejected_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/quizzes/?fields=id,bogus,owner')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Unknown fields: bogus, owner'})
+
+
+class LastModifiedTest(APITestCase):
+    """
+    Clients that only send If-Modified-Since must see every content change,
+    including deleted questions and answers.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('modified-test', 'modified@example.com', 'x')
+        self.client.force_authenticate(self.user)
+        self.quiz = create_quiz_with_questions(self.user, 'Quiz', 'https://youtu.be/x', QUESTIONS * 2)
+        # Move every timestamp into the past, so a change in this second is newer
+        past = timezone.now() - timedelta(hours=1)
+        Quiz.objects.filter(pk=self.quiz.pk).update(updated_at=past)
+        Question.objects.filter(quiz=self.quiz).update(updated_at=past)
+        self.path = f'/api/quizzes/{self.quiz.id}/'
+        self.last_modified = self.client.get(self.path)['Last-Modified']
+
+    def get_if_modified_since(self):
+        return self.client.get(self.path, HTTP_IF_MODIFIED_SINCE=self.last_modified)
+
+    def test_unchanged_quiz_is_not_modified(self):
+        self.assertEqual(self.get_if_modified_since().status_code, 304)
+
+    def test_deleted_question_moves_last_modified(self):
+        self.quiz.questions.first().delete()
+
+        self.assertEqual(self.get_if_modified_since().status_code, 200)
+
+    def test_deleted_answer_moves_last_modified(self):
+        Answer.objects.filter(question__quiz=self.quiz).first().delete()
+
+        self.assertEqual(self.get_if_modified_since().status_code, 200)
+
+    def test_bulk_added_question_moves_last_modified(self):
+        add_questions(self.quiz, QUESTIONS, start_order=2)
+
+        self.assertEqual(self.get_if_modified_since().status_code, 200)
+
+
+class DenyAll(BasePermission):
+    message = 'Nicht erlaubt.'
+
+    def has_permission(self, request, view):
+        return False
+
+
+class AlwaysThrottled(BaseThrottle):
+    def allow_request(self, request, view):
+        return False
+
+    def wait(self):
+        return 12.5
+
+
+class PublicView(AsyncAPIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    async def get(self, request):
+        return Response({'ok': True})
+
+
+class AsyncAPIViewChecksTest(SimpleTestCase):
+    def call(self, view_class):
+        return async_to_sync(view_class.as_view())(RequestFactory().get('/'))
+
+    def test_permission_classes_are_honored(self):
+        self.assertEqual(self.call(PublicView).status_code, 200)
+
+        response = self.call(type('DeniedView', (PublicView,), {'permission_classes': [DenyAll]}))
+
+        self.assertEqual(response.status_code, 403)
+        self.assertIn(b'Nicht erlaubt.', response.content)
+
+    def test_throttle_classes_are_honored(self):
+        response = self.call(type('ThrottledView', (PublicView,), {'throttle_classes': [AlwaysThrottled]}))
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '13')
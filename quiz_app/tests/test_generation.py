@@ -0,0 +1,155 @@
+import json
+import math
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from quiz_app.models import GenerationCache
+from quiz_app.pipeline.generation import (
+    QUESTION_COUNT, build_prompt, merge_questions, split_transcript, stream_questions
+)
+from quiz_app.pipeline.generators import QuestionGenerator, StubQuestionGenerator, get_generator
+
+
+def make_question(idx):
+    options = [f'Option {idx}-{n}' for n in range(4)]
+    return {'question': f'Frage {idx}?', 'options': options, 'correct_answer': options[0]}
+
+
+class ChunkedGenerator(QuestionGenerator):
+    """
+    Streams one question object per chunk and the closing bracket last,
+    like Gemini does.
+    """
+    model_name = 'chunked-test'
+
+    def __init__(self, count=QUESTION_COUNT):
+        self.count = count
+        self.stream_calls = 0
+
+    def generate(self, prompt):
+        return ''.join(self.stream(prompt))
+
+    def stream(self, prompt):
+        self.stream_calls += 1
+        yield '['
+        for idx in range(self.count):
+            yield ('' if idx == 0 else ',') + json.dumps(make_question(idx))
+        yield ']'
+
+
+class StreamQuestionsCacheTest(TestCase):
+    def stream_with(self, generator, **kwargs):
+        with mock.patch('quiz_app.pipeline.generation.get_generator', return_value=generator):
+            return stream_questions('prompt', **kwargs)
+
+    def test_complete_stream_is_cached(self):
+        generator = ChunkedGenerator()
+
+        first = self.stream_with(generator)
+        second = self.stream_with(generator)
+
+        self.assertEqual(len(first), QUESTION_COUNT)
+        self.assertEqual(second, first)
+        self.assertEqual(GenerationCache.objects.count(), 1)
+        self.assertEqual(generator.stream_calls, 1)
+
+    def test_stream_is_cached_once_count_is_reached(self):
+        generator = ChunkedGenerator(count=QUESTION_COUNT + 3)
+
+        questions = self.stream_with(generator)
+
+        self.assertEqual(len(questions), QUESTION_COUNT)
+        self.assertEqual(GenerationCache.objects.count(), 1)
+
+    def test_truncated_stream_is_not_cached(self):
+        generator = ChunkedGenerator()
+
+        def broken_stream(prompt):
+            yield '[' + json.dumps(make_question(0))
+            raise ConnectionError('stream reset')
+
+        generator.stream = broken_stream
+        questions = self.stream_with(generator)
+
+        self.assertEqual(len(questions), 1)
+        self.assertEqual(GenerationCache.objects.count(), 0)
+
+    def test_questions_are_passed_on_as_they_arrive(self):
+        received = []
+        self.stream_with(ChunkedGenerator(), on_question=lambda q_data, index: received.append(index))
+        self.assertEqual(received, list(range(QUESTION_COUNT)))
+
+
+DISTINCT_QUESTIONS = [
+    'Welches Gas nehmen Pflanzen bei der Photosynthese auf?',
+    'Wie viele Chromosomen hat eine menschliche Körperzelle?',
+    'Wodurch entstehen Erdbeben an Plattengrenzen?',
+    'Was misst der Verbraucherpreisindex?',
+    'In welcher Stadt begann die Renaissance?',
+    'Warum bricht ein Vulkan aus?',
+    'Wer formulierte das Gravitationsgesetz?',
+    'Welche Gewalten trennt eine Demokratie?',
+    'Was treibt die natürliche Selektion an?',
+    'In welcher Einheit wird Stromstärke angegeben?',
+    'Welche Folgen hat steigender Meeresspiegel für Küsten?',
+    'Wozu dient ein Sortieralgorithmus?',
+]
+
+
+def question_with_text(text):
+    return dict(make_question(0), question=text)
+
+
+class MergeQuestionsTest(SimpleTestCase):
+    def test_distinct_questions_are_picked_round_robin(self):
+        windows = [
+            [question_with_text(text) for text in DISTINCT_QUESTIONS[:6]],
+            [question_with_text(text) for text in DISTINCT_QUESTIONS[6:]],
+        ]
+
+        merged = merge_questions(windows)
+
+        self.assertEqual(merged[:4], [windows[0][0], windows[1][0], windows[0][1], windows[1][1]])
+        self.assertEqual(len(merged), QUESTION_COUNT)
+
+    def test_near_duplicates_top_up_a_short_selection(self):
+        distinct = [question_with_text(text) for text in DISTINCT_QUESTIONS[:3]]
+        similar = [question_with_text(f'Worum geht es im Abschnitt über Sternentstehung {idx}?') for idx in range(10)]
+
+        merged = merge_questions([distinct, similar])
+
+        # Distinct questions first, then the near-duplicates of the second window
+        self.assertEqual(merged, [distinct[0], similar[0], distinct[1], distinct[2]] + similar[1:7])
+
+    def test_exact_duplicates_are_never_used(self):
+        questions = [question_with_text(text) for text in DISTINCT_QUESTIONS[:2]]
+
+        merged = merge_questions([questions, list(questions)])
+
+        self.assertEqual(merged, questions)
+
+    def test_stub_windows_fill_the_quiz(self):
+        generator = StubQuestionGenerator()
+        transcript = ' '.join(f'Satz {idx} über Thema{idx % 13} und Begriff{idx % 7} hier.' for idx in range(4000))
+        windows = split_transcript(transcript, 1000, 8)
+        per_window = max(3, math.ceil(QUESTION_COUNT * 1.5 / len(windows)))
+        self.assertEqual(len(windows), 8)
+
+        # The stub's questions depend on the prompt; some titles yield many near-duplicates
+        for title in ('t', 'Video', 'Vortrag'):
+            with self.subTest(title=title):
+                candidates = [
+                    json.loads(generator.generate(
+                        build_prompt({'title': title}, window, count=per_window, part=(idx + 1, len(windows)))
+                    ))
+                    for idx, window in enumerate(windows)
+                ]
+                self.assertEqual(len(merge_questions(candidates)), QUESTION_COUNT)
+
+
+class GeneratorSettingTest(SimpleTestCase):
+    def test_overriding_the_backend_replaces_the_cached_generator(self):
+        with override_settings(QUIZ_GENERATOR_BACKEND='quiz_app.tests.test_generation.ChunkedGenerator'):
+            self.assertIsInstance(get_generator(), ChunkedGenerator)
+        with override_settings(QUIZ_GENERATOR_BACKEND='quiz_app.pipeline.generators.StubQuestionGenerator'):
+            self.assertIsInstance(get_generator(), StubQuestionGenerator)
@@ -0,0 +1,22 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+
+class ImportBudgetTest(SimpleTestCase):
+    # Import time and RSS depend on the machine's load; `manage.py
+    # check_import_budget` enforces them. The tests only check which modules
+    # the web tier loads.
+    @override_settings(IMPORT_BUDGET_SECONDS=float('inf'), IMPORT_BUDGET_RSS_MB=float('inf'))
+    def test_web_tier_does_not_load_pipeline_modules(self):
+        output = StringIO()
+
+        call_command('check_import_budget', runs=1, stdout=output)
+
+        self.assertIn('Import budget OK.', output.getvalue())
+
+    @override_settings(IMPORT_BUDGET_FORBIDDEN_MODULES=['rest_framework'])
+    def test_forbidden_module_fails_the_check(self):
+        with self.assertRaisesMessage(CommandError, 'pipeline-only modules loaded: rest_framework'):
+            call_command('check_import_budget', runs=1, stdout=StringIO())
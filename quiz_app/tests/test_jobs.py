@@ -0,0 +1,93 @@
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quiz_app.models import Quiz, QuizGenerationJob
+from quiz_app.pipeline import runner
+from quiz_app.pipeline.runner import claim_jobs, recover_stale_jobs
+
+
+@override_settings(JOB_LEASE_SECONDS=90, JOB_MAX_ATTEMPTS=2)
+class StaleJobRecoveryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('worker-test', 'worker@example.com', 'x')
+
+    def create_running_job(self, heartbeat_age, attempts=1, quiz=None):
+        return QuizGenerationJob.objects.create(
+            user=self.user,
+            youtube_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+            status=QuizGenerationJob.STATUS_RUNNING,
+            stage=QuizGenerationJob.STAGE_GENERATING,
+            progress=40,
+            quiz=quiz,
+            started_at=timezone.now() - timedelta(seconds=heartbeat_age),
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age),
+            attempts=attempts,
+        )
+
+    def test_live_job_is_left_alone(self):
+        job = self.create_running_job(heartbeat_age=10)
+
+        self.assertEqual(recover_stale_jobs(), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.STATUS_RUNNING)
+
+    def test_stale_job_is_queued_again_and_reclaimed(self):
+        partial_quiz = Quiz.objects.create(user=self.user, title='Partial', youtube_url='https://youtu.be/x')
+        job = self.create_running_job(heartbeat_age=300, quiz=partial_quiz)
+
+        self.assertEqual(claim_jobs(1), [job.pk])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.STATUS_RUNNING)
+        self.assertEqual(job.stage, QuizGenerationJob.STAGE_QUEUED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNone(job.quiz_id)
+        self.assertGreater(job.heartbeat_at, timezone.now() - timedelta(seconds=5))
+        self.assertFalse(Quiz.objects.filter(pk=partial_quiz.pk).exists())
+
+    def test_stale_job_fails_after_max_attempts(self):
+        job = self.create_running_job(heartbeat_age=300, attempts=2)
+
+        self.assertEqual(recover_stale_jobs(), [job.pk])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.STATUS_FAILED)
+        self.assertTrue(job.error)
+        self.assertIsNotNone(job.finished_at)
+
+
+class InlineJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('inline-test', 'inline@example.com', 'x')
+
+    def create_pending_job(self):
+        return QuizGenerationJob.objects.create(
+            user=self.user,
+            youtube_url='https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+        )
+
+    def test_inline_run_claims_its_job_and_drains_the_queue(self):
+        left_behind = self.create_pending_job()
+        job = self.create_pending_job()
+
+        with mock.patch.object(runner, 'run_job_in_thread') as run_job_in_thread:
+            runner._run_inline(job.pk)
+
+        ran = [call.args[0] for call in run_job_in_thread.call_args_list]
+        self.assertEqual(ran, [job.pk, left_behind.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.STATUS_RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.heartbeat_at)
+
+    def test_inline_run_skips_a_job_claimed_by_a_worker(self):
+        job = self.create_pending_job()
+        self.assertEqual(claim_jobs(1), [job.pk])
+
+        with mock.patch.object(runner, 'run_job_in_thread') as run_job_in_thread:
+            runner._run_inline(job.pk)
+
+        run_job_in_thread.assert_not_called()
@@ -0,0 +1,130 @@
+import time
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from quiz_app.models import PipelineRun, QuizGenerationJob
+from quiz_app.pipeline import runner
+from quiz_app.pipeline.runner import QuizPipeline
+from quiz_app.pipeline.timing import StageTimer
+
+QUESTION = {
+    'question': 'Worum geht es?',
+    'options': ['A', 'B', 'C', 'D'],
+    'correct_answer': 'A',
+}
+
+
+class StageTimerTest(TestCase):
+    def test_nested_stage_is_excluded_from_enclosing_stage(self):
+        timer = StageTimer()
+        with mock.patch('quiz_app.pipeline.timing.pipeline_stage_seconds') as histogram:
+            with timer.stage('generate'):
+                with timer.stage('persist'):
+                    time.sleep(0.05)
+
+        self.assertLess(timer.stages['generate']['wall_s'], 0.04)
+        self.assertGreaterEqual(timer.stages['persist']['wall_s'], 0.05)
+        self.assertEqual(histogram.observe.call_count, 2)
+
+    def test_unobserved_stage_is_observed_once(self):
+        timer = StageTimer()
+        with mock.patch('quiz_app.pipeline.timing.pipeline_stage_seconds') as histogram:
+            for _ in range(3):
+                with timer.stage('persist', observe=False):
+                    pass
+            histogram.observe.assert_not_called()
+            timer.observe('persist')
+
+        histogram.observe.assert_called_once_with(timer.stages['persist']['wall_s'], stage='persist')
+
+    def test_failure_is_attributed_to_innermost_stage(self):
+        timer = StageTimer()
+        error = RuntimeError('boom')
+        with mock.patch('quiz_app.pipeline.timing.pipeline_stage_seconds'):
+            with self.assertRaises(RuntimeError):
+                with timer.stage('generate'):
+                    with timer.stage('persist'):
+                        raise error
+
+        self.assertEqual(timer.failed_stage(error), 'persist')
+
+    def test_failure_between_stages_uses_last_stage_entered(self):
+        timer = StageTimer()
+        self.assertEqual(timer.failed_stage(RuntimeError()), 'other')
+
+        with mock.patch('quiz_app.pipeline.timing.pipeline_stage_seconds'):
+            try:
+                with timer.stage('captions'):
+                    raise ValueError('unusable captions')
+            except ValueError:
+                pass
+            with timer.stage('download'):
+                pass
+
+        self.assertEqual(timer.failed_stage(RuntimeError()), 'download')
+
+
+class PipelineStageMetricsTest(TestCase):
+    def test_persist_is_observed_once_per_run(self):
+        user = User.objects.create_user('timer-test', 'timer@example.com', 'x')
+        video_info = {'title': 'Video', 'transcript': 'Text.'}
+
+        def fake_generate(video_info, use_cache=True, on_question=None):
+            for index in range(runner.QUESTION_COUNT):
+                on_question(QUESTION, index)
+            return [QUESTION] * runner.QUESTION_COUNT
+
+        pipeline = QuizPipeline()
+        with mock.patch.object(runner, 'generate_questions', fake_generate), \
+                mock.patch('quiz_app.pipeline.timing.pipeline_stage_seconds') as histogram:
+            pipeline._generate_questions(user, 'https://youtu.be/x', video_info)
+
+        stages = [call.kwargs['stage'] for call in histogram.observe.call_args_list]
+        self.assertEqual(sorted(stages), ['generate', 'persist'])
+        self.assertEqual(pipeline.quiz.questions.count(), runner.QUESTION_COUNT)
+
+    def test_failed_run_uses_timing_stage_label(self):
+        user = User.objects.create_user('failure-test', 'failure@example.com', 'x')
+        job = QuizGenerationJob.objects.create(user=user, youtube_url='https://example.com/video')
+        video_info = {'title': 'Video', 'transcript': 'Text.'}
+
+        def failing_generate(video_info, use_cache=True, on_question=None):
+            raise RuntimeError('Gemini unavailable')
+
+        with mock.patch.object(QuizPipeline, '_extract_video_info', return_value=video_info), \
+                mock.patch.object(runner, 'generate_questions', failing_generate), \
+                mock.patch.object(runner, 'pipeline_failures_total') as failures:
+            runner.run_job(job.pk)
+
+        failures.inc.assert_called_once_with(stage='generate')
+        self.assertEqual(PipelineRun.objects.get(job=job).failed_stage, 'generate')
+
+
+@override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'], METRICS_JOB_COUNTS_TTL=60)
+class MetricsViewTest(TestCase):
+    def setUp(self):
+        cache.delete('metrics:job_counts')
+        self.user = User.objects.create_user('metrics-test', 'metrics@example.com', 'x')
+
+    def test_other_addresses_are_rejected(self):
+        response = self.client.get('/api/metrics/', REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 403)
+
+    def test_forwarded_for_header_is_ignored(self):
+        response = self.client.get(
+            '/api/metrics/', REMOTE_ADDR='203.0.113.7', HTTP_X_FORWARDED_FOR='127.0.0.1'
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_job_counts_are_cached_between_scrapes(self):
+        QuizGenerationJob.objects.create(user=self.user, youtube_url='https://youtu.be/x')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/metrics/', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('quiz_jobs{status="pending"} 1', response.content.decode())
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/metrics/', REMOTE_ADDR='127.0.0.1')
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quiz_app.models import PipelineWorker
+from quiz_app.pipeline import runner
+from quiz_app.pipeline.runner import preload_whisper, report_worker
+
+
+@override_settings(JOB_LEASE_SECONDS=90, QUIZ_INLINE_WORKERS=0, WHISPER_MODEL_SIZE='base')
+class PipelineStatusTest(TestCase):
+    def add_worker(self, name, loaded_models, heartbeat_age=10):
+        return PipelineWorker.objects.create(
+            name=name,
+            loaded_models=loaded_models,
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age),
+        )
+
+    def status(self):
+        return self.client.get('/api/pipeline/status/').json()['whisper']
+
+    def test_cold_without_live_workers(self):
+        self.add_worker('gone:1', ['base'], heartbeat_age=300)
+
+        self.assertEqual(self.status(), {'model_size': 'base', 'warm': False, 'loaded_models': [], 'workers': 0})
+
+    def test_warm_when_every_live_worker_has_the_model(self):
+        self.add_worker('host:1', ['base'])
+        self.add_worker('host:2', ['base', 'small'])
+
+        self.assertEqual(
+            self.status(),
+            {'model_size': 'base', 'warm': True, 'loaded_models': ['base', 'small'], 'workers': 2}
+        )
+
+    def test_cold_while_a_worker_is_still_loading(self):
+        self.add_worker('host:1', ['base'])
+        self.add_worker('host:2', [])
+
+        self.assertFalse(self.status()['warm'])
+
+    @override_settings(QUIZ_INLINE_WORKERS=2)
+    def test_inline_workers_report_this_process(self):
+        with mock.patch.object(runner.whisper_models, 'loaded_sizes', return_value=['base']):
+            status = self.client.get('/api/pipeline/status/').json()['whisper']
+
+        self.assertTrue(status['warm'])
+        self.assertEqual(status['workers'], 1)
+
+
+@override_settings(JOB_LEASE_SECONDS=90)
+class WorkerHeartbeatTest(TestCase):
+    def test_report_refreshes_own_row_and_drops_stale_ones(self):
+        PipelineWorker.objects.create(name='gone:1', heartbeat_at=timezone.now() - timedelta(seconds=300))
+
+        with mock.patch.object(runner.whisper_models, 'loaded_sizes', return_value=['base']):
+            report_worker('host:1')
+            report_worker('host:1')
+
+        worker = PipelineWorker.objects.get()
+        self.assertEqual(worker.name, 'host:1')
+        self.assertEqual(worker.loaded_models, ['base'])
+
+    @override_settings(WHISPER_PRELOAD=True, WHISPER_MODEL_SIZE='tiny')
+    def test_preload_loads_the_configured_model(self):
+        with mock.patch.object(runner.whisper_models, 'preload') as preload:
+            preload_whisper()
+        preload.assert_called_once_with(['tiny'])
+
+    @override_settings(WHISPER_PRELOAD=False)
+    def test_preload_is_off_by_default(self):
+        with mock.patch.object(runner.whisper_models, 'preload') as preload:
+            preload_whisper()
+        preload.assert_not_called()
@@ -0,0 +1,117 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from auth_app.user_cache import user_cache
+from core.testing import QueryBudgetTestMixin
+from quiz_app.api.caching import PAYLOAD_CACHE_ALIAS
+from quiz_app.models import QuizGenerationJob
+from quiz_app.persistence import create_quiz_with_questions
+
+QUESTIONS = [
+    {'question': f'Frage {idx}?', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': 'B'}
+    for idx in range(10)
+]
+
+
+class QuizQueryCountTest(APITestCase):
+    """
+    The quiz endpoints run a fixed number of queries, however many quizzes
+    (with 10 questions of 4 answers each) the user has. Authentication is
+    forced, so only the view's own queries are counted.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('query-count', 'count@example.com', 'x')
+        self.client.force_authenticate(self.user)
+        self.quizzes = []
+
+    def create_quizzes(self, total):
+        while len(self.quizzes) < total:
+            self.quizzes.append(create_quiz_with_questions(
+                self.user, f'Quiz {len(self.quizzes)}', 'https://youtu.be/x', QUESTIONS
+            ))
+
+    def assert_constant_queries(self, expected, path_for):
+        for total in (1, 20):
+            with self.subTest(quizzes=total):
+                self.create_quizzes(total)
+                caches[PAYLOAD_CACHE_ALIAS].clear()
+                with self.assertNumQueries(expected):
+                    response = self.client.get(path_for(self.quizzes[-1]))
+                self.assertEqual(response.status_code, 200)
+
+    def test_list(self):
+        self.assert_constant_queries(1, lambda quiz: '/api/quizzes/')
+
+    def test_list_with_questions(self):
+        # Quizzes, questions and answers
+        self.assert_constant_queries(3, lambda quiz: '/api/quizzes/?include=questions')
+
+    def test_detail(self):
+        # Version lookup, then quiz, questions and answers
+        self.assert_constant_queries(4, lambda quiz: f'/api/quizzes/{quiz.id}/')
+
+    def test_questions_are_served_from_prefetched_answers(self):
+        self.create_quizzes(2)
+
+        response = self.client.get('/api/quizzes/?include=questions')
+
+        question = response.json()['results'][0]['questions'][0]
+        self.assertEqual(question['question_options'], ['A', 'B', 'C', 'D'])
+        self.assertEqual(question['answer'], 'B')
+
+
+@override_settings(AUTH_THROTTLE_ENABLED=False)
+class QuizQueryBudgetTest(QueryBudgetTestMixin, APITransactionTestCase):
+    """
+    The quiz endpoints stay within their QUERY_BUDGETS, authenticated with
+    the access token cookie like a browser (the user lookup is counted).
+    Transaction test case, so atomic blocks run as in production instead of
+    as savepoints.
+    """
+
+    def setUp(self):
+        caches[PAYLOAD_CACHE_ALIAS].clear()
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user('budget', 'budget@example.com', 'Budget-Passw0rd!')
+        self.client.post('/api/login/', {'username': 'budget', 'password': 'Budget-Passw0rd!'}, format='json')
+        user_cache.clear()
+        self.quiz = create_quiz_with_questions(self.user, 'Quiz', 'https://youtu.be/x', QUESTIONS)
+
+    def test_list(self):
+        with self.assertQueryBudget('quiz:quiz-list-create', 'GET'):
+            response = self.client.get('/api/quizzes/?include=questions')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUIZ_INLINE_WORKERS=0)
+    def test_create(self):
+        with self.assertQueryBudget('quiz:quiz-list-create', 'POST'):
+            response = self.client.post(
+                '/api/quizzes/', {'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'}, format='json'
+            )
+        self.assertEqual(response.status_code, 202)
+
+    def test_job_detail(self):
+        job = QuizGenerationJob.objects.create(user=self.user, youtube_url='https://youtu.be/x')
+
+        with self.assertQueryBudget('quiz:quiz-job-detail', 'GET'):
+            response = self.client.get(f'/api/quizzes/jobs/{job.id}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail(self):
+        with self.assertQueryBudget('quiz:quiz-detail', 'GET'):
+            response = self.client.get(f'/api/quizzes/{self.quiz.id}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_update(self):
+        with self.assertQueryBudget('quiz:quiz-detail', 'PATCH'):
+            response = self.client.patch(f'/api/quizzes/{self.quiz.id}/', {'title': 'Neu'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete(self):
+        with self.assertQueryBudget('quiz:quiz-detail', 'DELETE'):
+            response = self.client.delete(f'/api/quizzes/{self.quiz.id}/')
+        self.assertEqual(response.status_code, 204)
@@ -0,0 +1,113 @@
+from pathlib import Path
+from django.test import SimpleTestCase
+
+from quiz_app.pipeline.youtube import (
+    SOURCE_CAPTIONS_AUTO, SOURCE_CAPTIONS_MANUAL, parse_captions, parse_srv, parse_vtt, select_caption_track
+)
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'captions'
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text(encoding='utf-8')
+
+
+def track(language, ext):
+    return {'ext': ext, 'url': f'https://www.youtube.com/api/timedtext?lang={language}&fmt={ext}'}
+
+
+def tracks(language, exts=('json3', 'srv1', 'srv2', 'srv3', 'ttml', 'vtt')):
+    return [track(language, ext) for ext in exts]
+
+
+class ParseCaptionsTest(SimpleTestCase):
+    def test_rolling_auto_captions_are_not_repeated(self):
+        lines = parse_vtt(read_fixture('auto_rolling.de.vtt'))
+
+        self.assertEqual(lines, [
+            'heute sprechen wir über',
+            'die Photosynthese und ihre',
+            'Rolle für Pflanzen & Tiere',
+        ])
+
+    def test_manual_vtt_drops_header_blocks_cue_ids_and_tags(self):
+        lines = parse_vtt(read_fixture('manual.de.vtt'))
+
+        self.assertEqual(lines, [
+            'Heute sprechen wir über die Photosynthese.',
+            'Pflanzen wandeln Licht',
+            'in chemische Energie um.',
+            'Chlorophyll absorbiert rotes & blaues Licht.',
+        ])
+
+    def test_srv3_word_segments_are_joined_and_append_paragraphs_skipped(self):
+        lines = parse_srv(read_fixture('auto.de.srv3'))
+
+        self.assertEqual(lines, [
+            'heute sprechen wir über',
+            'die Photosynthese und ihre',
+            'Rolle für Pflanzen',
+        ])
+
+    def test_srv1_double_escaped_entities_are_decoded(self):
+        lines = parse_srv(read_fixture('manual.de.srv1'))
+
+        self.assertEqual(lines, [
+            'Heute sprechen wir über die Photosynthese.',
+            'Pflanzen wandeln Licht in chemische Energie um.',
+            'Chlorophyll absorbiert rotes & blaues Licht – das ist\'s.',
+        ])
+
+    def test_parse_captions_joins_lines(self):
+        text = parse_captions(read_fixture('auto_rolling.de.vtt'), 'vtt')
+
+        self.assertEqual(text, 'heute sprechen wir über die Photosynthese und ihre Rolle für Pflanzen & Tiere')
+
+    def test_unsupported_format_raises(self):
+        with self.assertRaises(ValueError):
+            parse_captions('{}', 'json3')
+
+
+class SelectCaptionTrackTest(SimpleTestCase):
+    def test_manual_subtitles_are_preferred_in_vtt(self):
+        info = {
+            'language': 'de',
+            'subtitles': {'de': tracks('de')},
+            'automatic_captions': {'de-orig': tracks('de-orig'), 'de': tracks('de')},
+        }
+
+        self.assertEqual(select_caption_track(info, 'de'), (SOURCE_CAPTIONS_MANUAL, track('de', 'vtt')))
+
+    def test_manual_regional_variant_is_used(self):
+        info = {'subtitles': {'en': tracks('en'), 'de-DE': tracks('de-DE', ('srv3', 'srv1'))}}
+
+        self.assertEqual(select_caption_track(info, 'de'), (SOURCE_CAPTIONS_MANUAL, track('de-DE', 'srv3')))
+
+    def test_original_language_auto_track_is_used_without_manual_subtitles(self):
+        info = {
+            'language': 'de',
+            'subtitles': {'en': tracks('en')},
+            'automatic_captions': {'de-orig': tracks('de-orig'), 'de': tracks('de'), 'fr': tracks('fr')},
+        }
+
+        self.assertEqual(select_caption_track(info, 'de'), (SOURCE_CAPTIONS_AUTO, track('de-orig', 'vtt')))
+
+    def test_auto_track_without_orig_suffix_in_original_language(self):
+        info = {'language': 'de', 'automatic_captions': {'de': tracks('de', ('srv1', 'json3'))}}
+
+        self.assertEqual(select_caption_track(info, 'de'), (SOURCE_CAPTIONS_AUTO, track('de', 'srv1')))
+
+    def test_machine_translated_auto_track_is_rejected(self):
+        # English video: YouTube offers a translated "de" track, but no de-orig
+        info = {
+            'language': 'en',
+            'subtitles': {},
+            'automatic_captions': {'en-orig': tracks('en-orig'), 'en': tracks('en'), 'de': tracks('de')},
+        }
+
+        self.assertEqual(select_caption_track(info, 'de'), (None, None))
+
+    def test_tracks_in_unsupported_formats_are_ignored(self):
+        info = {'language': 'de', 'subtitles': {'de': tracks('de', ('json3', 'ttml'))}}
+
+        self.assertEqual(select_caption_track(info, 'de'), (None, None))